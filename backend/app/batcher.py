@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+# Micro-batching is opt-in: concurrent /predict calls are coalesced into one predict_proba
+MICRO_BATCHING = os.environ.get("MICRO_BATCHING", "0") == "1"
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", "3"))
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "64"))
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+class MicroBatcher:
+    """
+    Coalesces concurrent predict_proba calls into one vectorized model call.
+    A batch is dispatched when BATCH_MAX_SIZE rows are queued or when the
+    oldest queued request has waited BATCH_WINDOW_MS, whichever comes first.
+    """
+
+    def __init__(self, window_ms=BATCH_WINDOW_MS, max_batch_size=BATCH_MAX_SIZE):
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._cond = threading.Condition()
+        self._pending = deque()  # (model, texts, future, enqueued_at)
+        self._pending_rows = 0
+        self._closed = False
+
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+        self._max_rows = 0
+        self._wait_total = 0.0
+        self._size_histogram = {}
+
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def predict_proba(self, model, texts):
+        """Queue texts for the next batch and block until their probabilities are ready."""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Micro-batcher is shut down.")
+            self._pending.append((model, texts, future, time.perf_counter()))
+            self._pending_rows += len(texts)
+            self._cond.notify()
+        return future.result()
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+
+            deadline = self._pending[0][3] + self.window
+            while self._pending_rows < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = [self._pending.popleft()]
+            rows = len(batch[0][1])
+            while self._pending and rows + len(self._pending[0][1]) <= self.max_batch_size:
+                item = self._pending.popleft()
+                batch.append(item)
+                rows += len(item[1])
+            self._pending_rows -= rows
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        import numpy as np
+
+        started = time.perf_counter()
+
+        # Requests can target different models (e.g. pinned versions); run one call per model
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+
+        for items in groups.values():
+            model = items[0][0]
+            texts = [text for item in items for text in item[1]]
+            try:
+                probs = np.asarray(model.predict_proba(texts))
+            except Exception as e:
+                for item in items:
+                    item[2].set_exception(e)
+                continue
+
+            offset = 0
+            for _, item_texts, future, _ in items:
+                future.set_result(probs[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+        rows = sum(len(item[1]) for item in batch)
+        bucket = 1 << (rows - 1).bit_length()
+        with self._cond:
+            self._batches += 1
+            self._requests += len(batch)
+            self._rows += rows
+            self._max_rows = max(self._max_rows, rows)
+            self._wait_total += sum(started - item[3] for item in batch)
+            self._size_histogram[bucket] = self._size_histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        with self._cond:
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "queue_depth": len(self._pending),
+                "queued_rows": self._pending_rows,
+                "batches": self._batches,
+                "requests": self._requests,
+                "rows": self._rows,
+                "avg_batch_size": self._rows / self._batches if self._batches else 0.0,
+                "max_observed_batch_size": self._max_rows,
+                "avg_queue_wait_ms": (self._wait_total / self._requests * 1000.0) if self._requests else 0.0,
+                "batch_size_histogram": {f"<={k}": v for k, v in sorted(self._size_histogram.items())},
+            }
+
+    def close(self):
+        """Drain whatever is queued and stop the worker thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
+
+def get_batcher():
+    """Lazy-start the micro-batcher when MICRO_BATCHING is enabled."""
+    global _batcher
+    if not MICRO_BATCHING:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher()
+    return _batcher
+
+def close_batcher():
+    global _batcher
+    if _batcher is not None:
+        _batcher.close()
+        _batcher = None
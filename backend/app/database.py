@@ -1,16 +1,195 @@
 import sqlite3
 import os
+import queue
+import threading
+from contextlib import contextmanager
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "anxiety_predictions.db")
 
-def get_connection():
-    """Get a direct connection to the SQLite database."""
-    conn = sqlite3.connect(DB_PATH)
+# Connection pool and pragma tuning
+SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", "8"))
+SQLITE_POOL_TIMEOUT = float(os.environ.get("SQLITE_POOL_TIMEOUT", "10"))
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable enough under WAL
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "16384"))
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _configure(conn):
     conn.row_factory = sqlite3.Row # To access columns by name
+    # WAL lets /history and /insights readers run while /predict is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
     return conn
 
+def get_connection():
+    """Get a direct connection to the SQLite database."""
+    conn = sqlite3.connect(DB_PATH, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000.0)
+    return _configure(conn)
+
+class ConnectionPool:
+    """
+    Fixed-size pool of tuned SQLite connections shared by the API threads.
+    Connections are opened on demand up to max_size and reused afterwards.
+    """
+
+    def __init__(self, path, max_size=SQLITE_POOL_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000.0, check_same_thread=False)
+        return _configure(conn)
+
+    def acquire(self, timeout=SQLITE_POOL_TIMEOUT):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed.")
+            if self._created < self.max_size:
+                self._created += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._created -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError("Timed out waiting for a database connection.")
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if not self._closed:
+                self._idle.put(conn)
+                return
+            self._created -= 1
+        conn.close()
+
+    def stats(self):
+        with self._lock:
+            idle = self._idle.qsize()
+            return {"max_size": self.max_size, "open": self._created, "idle": idle, "in_use": self._created - idle}
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._created -= 1
+
+def get_pool():
+    """Lazy-create the shared connection pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+@contextmanager
+def pooled_connection():
+    """Borrow a pooled connection for the duration of a with-block."""
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+def close_pool():
+    """Close every pooled connection (called on shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+# Daily aggregate per (day, prediction), kept in step with every insert and delete
+# so /insights reads O(days) rows instead of scanning the predictions table.
+ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS daily_prediction_stats (
+        day TEXT NOT NULL,
+        prediction TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        confidence_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, prediction)
+    ) WITHOUT ROWID;
+"""
+
+# Timestamps arrive both as ISO-8601 with an offset (predict_with_words) and as
+# CURRENT_TIMESTAMP text (column default); these expressions normalize either one.
+DAY_SQL = "date({0})"
+EPOCH_SQL = "(julianday({0}) - 2440587.5) * 86400.0"
+
+def _migrate_daily_rollups(cur):
+    cur.execute(ROLLUP_DDL)
+    _rebuild_daily_rollups(cur)
+
+def _migrate_day_columns(cur):
+    cur.execute("ALTER TABLE predictions ADD COLUMN day TEXT")
+    cur.execute("ALTER TABLE predictions ADD COLUMN created_at REAL")
+    cur.execute(f"UPDATE predictions SET day = {DAY_SQL.format('timestamp')}, created_at = {EPOCH_SQL.format('timestamp')}")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_predictions_day_prediction ON predictions(day, prediction)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions(created_at)")
+
+def _migrate_model_version(cur):
+    # NULL for rows scored before the model registry existed
+    cur.execute("ALTER TABLE predictions ADD COLUMN model_version TEXT")
+
+def _drop_unused_indexes(cur):
+    # /insights reads the rollup table and /history pages on the id primary key,
+    # so nothing seeks on these; they only slowed every insert down
+    cur.execute("DROP INDEX IF EXISTS idx_predictions_day_prediction")
+    cur.execute("DROP INDEX IF EXISTS idx_predictions_created_at")
+
+# Applied in order; PRAGMA user_version records how many have run.
+# Append new migrations to the end, never edit or reorder existing ones.
+MIGRATIONS = [
+    _migrate_daily_rollups,
+    _migrate_day_columns,
+    _migrate_model_version,
+    _drop_unused_indexes,
+]
+
+def run_migrations(conn):
+    """Apply pending schema migrations, each in its own transaction. Returns the schema version."""
+    cur = conn.cursor()
+    version = cur.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        cur.execute("BEGIN")
+        try:
+            migration(cur)
+            cur.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Applied database migration {number}: {migration.__name__}")
+        version = number
+    return version
+
 def init_db():
-    """Initialize the SQLite database table."""
+    """Initialize the SQLite database table and bring the schema up to date."""
     conn = get_connection()
     try:
         cur = conn.cursor()
@@ -25,7 +204,62 @@ def init_db():
             );
         """)
         conn.commit()
+        run_migrations(conn)
     except Exception as e:
         print(f"Failed to initialize database: {e}")
     finally:
         conn.close()
+
+def save_predictions(rows):
+    """Insert scored predictions in a single transaction. Raises when the write fails."""
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        cur.executemany(f"""
+            INSERT INTO predictions (text, prediction, confidence, detected_words, timestamp, model_version, day, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, {DAY_SQL.format('?5')}, {EPOCH_SQL.format('?5')})
+        """, rows)
+        cur.executemany(f"""
+            INSERT INTO daily_prediction_stats (day, prediction, count, confidence_sum)
+            VALUES (COALESCE({DAY_SQL.format('?')}, ''), ?, 1, ?)
+            ON CONFLICT(day, prediction) DO UPDATE SET
+                count = count + 1,
+                confidence_sum = confidence_sum + excluded.confidence_sum
+        """, [(ts, pred, conf) for _, pred, conf, _, ts, _ in rows])
+        conn.commit()
+
+def delete_prediction(conn, item_id):
+    """
+    Delete one prediction and take it out of the daily rollup in the same transaction.
+    Returns False when the id doesn't exist.
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT COALESCE(day, '') AS day, prediction, confidence FROM predictions WHERE id = ?", (item_id,))
+    row = cur.fetchone()
+    if row is None:
+        return False
+    cur.execute("DELETE FROM predictions WHERE id = ?", (item_id,))
+    cur.execute("""
+        UPDATE daily_prediction_stats
+        SET count = count - 1, confidence_sum = confidence_sum - ?
+        WHERE day = ? AND prediction = ?
+    """, (row["confidence"], row["day"], row["prediction"]))
+    cur.execute("DELETE FROM daily_prediction_stats WHERE day = ? AND prediction = ? AND count <= 0", (row["day"], row["prediction"]))
+    conn.commit()
+    return True
+
+def _rebuild_daily_rollups(cur):
+    cur.execute("DELETE FROM daily_prediction_stats")
+    cur.execute(f"""
+        INSERT INTO daily_prediction_stats (day, prediction, count, confidence_sum)
+        SELECT COALESCE({DAY_SQL.format('timestamp')}, ''), prediction, COUNT(*), SUM(confidence)
+        FROM predictions
+        GROUP BY 1, 2
+    """)
+
+def rebuild_daily_rollups(conn):
+    """Recompute daily_prediction_stats from the full predictions table."""
+    cur = conn.cursor()
+    _rebuild_daily_rollups(cur)
+    conn.commit()
+    cur.execute("SELECT COUNT(*) FROM daily_prediction_stats")
+    return cur.fetchone()[0]
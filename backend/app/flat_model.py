@@ -0,0 +1,534 @@
+"""
+Flat, memory-mappable model artifact.
+
+A trained sklearn pipeline (TF-IDF features + soft-voting ensemble) is exported
+to a directory of .npy arrays plus a JSON manifest: sorted vocabulary tables,
+idf vectors and every linear coefficient matrix. Loading maps the arrays
+read-only, so worker processes share the pages through the OS page cache
+instead of each unpickling a private copy.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.special import expit, logsumexp, softmax
+
+FLAT_FORMAT = "flat-v1"
+MANIFEST_NAME = "manifest.json"
+
+# TfidfVectorizer settings needed to rebuild the (stateless) analyzer at load time
+_VECTORIZER_PARAMS = ("analyzer", "ngram_range", "lowercase", "token_pattern",
+                      "stop_words", "strip_accents", "encoding", "decode_error")
+_TFIDF_PARAMS = ("binary", "norm", "use_idf", "sublinear_tf")
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+class _ArrayWriter:
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+
+    def save(self, name, array):
+        filename = f"{name}.npy"
+        np.save(os.path.join(self.out_dir, filename), np.ascontiguousarray(array))
+        return filename
+
+def _vectorizer_params(vec):
+    if vec.preprocessor is not None or vec.tokenizer is not None or callable(vec.analyzer):
+        raise ValueError("Custom preprocessors, tokenizers or analyzers can't be exported.")
+    params = {name: getattr(vec, name) for name in _VECTORIZER_PARAMS}
+    params["ngram_range"] = list(params["ngram_range"])
+    if params["stop_words"] is not None and not isinstance(params["stop_words"], str):
+        params["stop_words"] = sorted(params["stop_words"])
+    return params
+
+def _export_tfidf(name, vec, writer):
+    vocab = vec.vocabulary_
+    terms = sorted(vocab)
+    return {
+        "name": name,
+        "kind": "tfidf",
+        "params": _vectorizer_params(vec),
+        "tfidf": {param: getattr(vec, param) for param in _TFIDF_PARAMS},
+        "n_features": len(vocab),
+        # Sorted term table + matching column ids: looked up with a binary search
+        "terms": writer.save(f"features.{name}.terms", np.array(terms, dtype=str)),
+        "columns": writer.save(f"features.{name}.columns", np.array([vocab[t] for t in terms], dtype=np.int32)),
+        "idf": writer.save(f"features.{name}.idf", vec.idf_) if vec.use_idf else None,
+    }
+
+def _export_hashing(name, hasher, idf_transformer, writer):
+    params = _vectorizer_params(hasher)
+    params.update({key: getattr(hasher, key) for key in ("n_features", "alternate_sign", "binary", "norm")})
+    tfidf = {param: getattr(idf_transformer, param) for param in ("norm", "use_idf", "sublinear_tf")}
+    tfidf["binary"] = False
+    return {
+        "name": name,
+        "kind": "hashing",
+        "params": params,
+        "tfidf": tfidf,
+        "n_features": hasher.n_features,
+        "idf": writer.save(f"features.{name}.idf", idf_transformer.idf_) if idf_transformer.use_idf else None,
+    }
+
+def _export_features(features, writer):
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+    from sklearn.pipeline import FeatureUnion, Pipeline
+
+    if isinstance(features, FeatureUnion):
+        if features.transformer_weights:
+            raise ValueError("FeatureUnion transformer_weights are not supported.")
+        parts = features.transformer_list
+    else:
+        parts = [("tfidf", features)]
+
+    specs = []
+    for name, transformer in parts:
+        if isinstance(transformer, Pipeline):
+            steps = [step for _, step in transformer.steps]
+            if (len(steps) == 2 and isinstance(steps[0], HashingVectorizer)
+                    and isinstance(steps[1], TfidfTransformer)):
+                specs.append(_export_hashing(name, steps[0], steps[1], writer))
+                continue
+        if not isinstance(transformer, TfidfVectorizer):
+            raise ValueError(f"Unsupported feature transformer: {type(transformer).__name__}")
+        specs.append(_export_tfidf(name, transformer, writer))
+    return specs
+
+def _export_member(name, est, classes, writer):
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.preprocessing import LabelEncoder
+    from sklearn.svm import LinearSVC
+
+    if isinstance(est, LogisticRegression):
+        return {
+            "name": name,
+            "kind": "logistic",
+            "coef": writer.save(f"members.{name}.coef", est.coef_),
+            "intercept": writer.save(f"members.{name}.intercept", est.intercept_),
+        }
+
+    if isinstance(est, MultinomialNB):
+        return {
+            "name": name,
+            "kind": "multinomial_nb",
+            "feature_log_prob": writer.save(f"members.{name}.feature_log_prob", est.feature_log_prob_),
+            "class_log_prior": writer.save(f"members.{name}.class_log_prior", est.class_log_prior_),
+        }
+
+    if isinstance(est, CalibratedClassifierCV):
+        if est.method not in ("sigmoid", "isotonic"):
+            raise ValueError(f"Unsupported calibration method: {est.method}")
+        folds = []
+        for i, calibrated in enumerate(est.calibrated_classifiers_):
+            base = calibrated.estimator
+            if not isinstance(base, LinearSVC):
+                raise ValueError(f"Unsupported calibrated estimator: {type(base).__name__}")
+            prefix = f"members.{name}.fold{i}"
+            calibrators = []
+            for k, calibrator in enumerate(calibrated.calibrators):
+                if est.method == "sigmoid":
+                    calibrators.append({"a": float(calibrator.a_), "b": float(calibrator.b_)})
+                else:
+                    calibrators.append({
+                        "x": writer.save(f"{prefix}.iso{k}.x", calibrator.X_thresholds_),
+                        "y": writer.save(f"{prefix}.iso{k}.y", calibrator.y_thresholds_),
+                    })
+            folds.append({
+                "coef": writer.save(f"{prefix}.coef", base.coef_),
+                "intercept": writer.save(f"{prefix}.intercept", base.intercept_),
+                "class_indices": LabelEncoder().fit(calibrated.classes).transform(base.classes_).tolist(),
+                "calibrators": calibrators,
+            })
+        return {"name": name, "kind": "calibrated_linear", "method": est.method, "folds": folds}
+
+    raise ValueError(f"Unsupported classifier: {type(est).__name__}")
+
+def export_flat_model(pipeline, out_dir, source_path=None):
+    """
+    Export a fitted Pipeline([features, classifier]) to out_dir.
+    The directory is written next to its final location and renamed into place,
+    so a running server never sees a half-written artifact.
+    """
+    from sklearn.ensemble import VotingClassifier
+
+    features, clf = pipeline.steps[0][1], pipeline.steps[-1][1]
+    classes = np.asarray(clf.classes_)
+    if len(classes) < 3:
+        raise ValueError("Only multi-class (3+) models can be exported.")
+
+    tmp_dir = out_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    writer = _ArrayWriter(tmp_dir)
+
+    if isinstance(clf, VotingClassifier):
+        if clf.voting != "soft":
+            raise ValueError("Only soft-voting ensembles can be exported.")
+        names = [name for name, est in clf.estimators if est not in (None, "drop")]
+        members = [_export_member(name, est, classes, writer) for name, est in zip(names, clf.estimators_)]
+        weights = list(clf._weights_not_none) if clf.weights is not None else None
+    else:
+        members = [_export_member("clf", clf, classes, writer)]
+        weights = None
+
+    manifest = {
+        "format": FLAT_FORMAT,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "source": os.path.basename(source_path) if source_path else None,
+        "source_sha256": _file_sha256(source_path) if source_path else None,
+        "classes": classes.tolist(),
+        "features": _export_features(features, writer),
+        "members": members,
+        "weights": weights,
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    # The fused (FAST_INFERENCE) matrix is stacked here once, so workers mmap it
+    # instead of each building a private dense copy at load time
+    exported = FlatModel(tmp_dir, mmap=False)
+    coef, intercept = _stack_blocks(exported.members)
+    manifest["fused"] = {"coef": writer.save("fused.coef", coef), "intercept": writer.save("fused.intercept", intercept)}
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(out_dir):
+        old_dir = out_dir.rstrip(os.sep) + ".old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.rename(out_dir, old_dir)
+        os.rename(tmp_dir, out_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    else:
+        os.rename(tmp_dir, out_dir)
+    return manifest
+
+# ---------------------------------------------------------------------------
+# Inference
+# ---------------------------------------------------------------------------
+
+class TfidfFeatures:
+    """TF-IDF transform driven by a memory-mapped sorted vocabulary table."""
+
+    def __init__(self, spec, load):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.name = spec["name"]
+        self.n_features = spec["n_features"]
+        params = dict(spec["params"])
+        params["ngram_range"] = tuple(params["ngram_range"])
+        # Only the analyzer is used; it carries no fitted state
+        self.analyze = TfidfVectorizer(**params).build_analyzer()
+        self.terms = load(spec["terms"])
+        self.columns = load(spec["columns"])
+        self.idf = load(spec["idf"]) if spec.get("idf") else None
+        self.binary = spec["tfidf"]["binary"]
+        self.norm = spec["tfidf"]["norm"]
+        self.sublinear_tf = spec["tfidf"]["sublinear_tf"]
+
+    def counts(self, docs):
+        # One vectorized binary search over the n-grams of the whole batch
+        grams, rows = [], []
+        for i, doc in enumerate(docs):
+            doc_grams = self.analyze(doc)
+            grams.extend(doc_grams)
+            rows.append(np.full(len(doc_grams), i, dtype=np.int32))
+        if grams:
+            grams = np.asarray(grams)
+            rows = np.concatenate(rows)
+            pos = np.minimum(np.searchsorted(self.terms, grams), len(self.terms) - 1)
+            hit = self.terms[pos] == grams
+            rows, cols = rows[hit], self.columns[pos[hit]]
+        else:
+            rows = cols = np.zeros(0, dtype=np.int32)
+        X = sp.csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(docs), self.n_features))
+        X.sum_duplicates()
+        return X
+
+    def transform(self, docs):
+        X = self.counts(docs)
+        if self.binary:
+            X.data.fill(1)
+        return _weight(X, self.sublinear_tf, self.idf, self.norm)
+
+class HashingFeatures:
+    """Hashed n-gram counts with a fitted idf vector; no vocabulary to map."""
+
+    def __init__(self, spec, load):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.name = spec["name"]
+        self.n_features = spec["n_features"]
+        params = dict(spec["params"])
+        params["ngram_range"] = tuple(params["ngram_range"])
+        self.hasher = HashingVectorizer(**params)
+        self.idf = load(spec["idf"]) if spec.get("idf") else None
+        self.norm = spec["tfidf"]["norm"]
+        self.sublinear_tf = spec["tfidf"]["sublinear_tf"]
+
+    def transform(self, docs):
+        return _weight(self.hasher.transform(docs), self.sublinear_tf, self.idf, self.norm)
+
+def _weight(X, sublinear_tf, idf, norm):
+    # Same steps, in the same order, as TfidfTransformer.transform
+    from sklearn.preprocessing import normalize
+
+    if sublinear_tf:
+        np.log(X.data, X.data)
+        X.data += 1
+    if idf is not None:
+        X.data *= idf[X.indices]
+    if norm is not None:
+        X = normalize(X, norm=norm, copy=False)
+    return X
+
+def _isotonic(x, y):
+    from scipy.interpolate import interp1d
+
+    if len(x) == 1:
+        return lambda t: np.full(len(t), y[0], dtype=float)
+    f = interp1d(x, y, kind="linear")
+    lo, hi = x[0], x[-1]
+    return lambda t: f(np.clip(t, lo, hi))
+
+def _isotonic_table(x, y):
+    # Vectorized lookup table; np.interp clamps to the end values like the 'clip' bound
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    return lambda t: np.interp(t, x, y)
+
+def _sigmoid(a, b):
+    return lambda t: expit(-(a * t + b))
+
+def _linear_scores(X, blocks):
+    return [X @ coef.T + intercept for coef, intercept in blocks]
+
+# Each member exposes its linear blocks (coef, intercept) and turns the matching
+# decision scores into probabilities, so FusedScorer can evaluate every block at once.
+
+class LogisticMember:
+    def __init__(self, spec, load):
+        self.name = spec["name"]
+        self.blocks = [(load(spec["coef"]), load(spec["intercept"]))]
+
+    def proba_from_scores(self, scores, lookup=False):
+        return softmax(scores[0], axis=1)
+
+    def predict_proba(self, X):
+        return self.proba_from_scores(_linear_scores(X, self.blocks))
+
+class MultinomialNBMember:
+    def __init__(self, spec, load):
+        self.name = spec["name"]
+        self.blocks = [(load(spec["feature_log_prob"]), load(spec["class_log_prior"]))]
+
+    def proba_from_scores(self, scores, lookup=False):
+        jll = scores[0]
+        return np.exp(jll - logsumexp(jll, axis=1)[:, np.newaxis])
+
+    def predict_proba(self, X):
+        return self.proba_from_scores(_linear_scores(X, self.blocks))
+
+class CalibratedLinearMember:
+    """Mean of per-fold calibrated LinearSVC probabilities (CalibratedClassifierCV)."""
+
+    def __init__(self, spec, load, n_classes):
+        self.name = spec["name"]
+        self.method = spec["method"]
+        self.n_classes = n_classes
+        self.blocks = []
+        self.folds = []  # (class_indices, exact calibrators, lookup-table calibrators)
+        for fold in spec["folds"]:
+            if self.method == "sigmoid":
+                exact = [_sigmoid(c["a"], c["b"]) for c in fold["calibrators"]]
+                tables = exact
+            else:
+                thresholds = [(load(c["x"]), load(c["y"])) for c in fold["calibrators"]]
+                exact = [_isotonic(x, y) for x, y in thresholds]
+                tables = [_isotonic_table(x, y) for x, y in thresholds]
+            self.blocks.append((load(fold["coef"]), load(fold["intercept"])))
+            self.folds.append((fold["class_indices"], exact, tables))
+
+    @staticmethod
+    def _normalize(proba):
+        n_classes = proba.shape[1]
+        denominator = np.sum(proba, axis=1)[:, np.newaxis]
+        # All calibrators at zero for a sample: fall back to uniform
+        uniform = np.full_like(proba, 1 / n_classes)
+        proba = np.divide(proba, denominator, out=uniform, where=denominator != 0)
+        proba[(1.0 < proba) & (proba <= 1.0 + 1e-5)] = 1.0
+        return proba
+
+    def fold_proba(self, decision, class_indices, calibrators):
+        proba = np.zeros((decision.shape[0], self.n_classes))
+        for class_idx, column, calibrator in zip(class_indices, decision.T, calibrators):
+            proba[:, class_idx] = calibrator(column)
+        return self._normalize(proba)
+
+    def proba_from_scores(self, scores, lookup=False):
+        mean = np.zeros((scores[0].shape[0], self.n_classes))
+        for decision, (class_indices, exact, tables) in zip(scores, self.folds):
+            mean += self.fold_proba(decision, class_indices, tables if lookup else exact)
+        mean /= len(self.folds)
+        return mean
+
+    def predict_proba(self, X):
+        return self.proba_from_scores(_linear_scores(X, self.blocks))
+
+def _stack_blocks(members):
+    """Every member's (coef, intercept) blocks as one (n_features x n_outputs) matrix and intercept."""
+    coefs = [coef for member in members for coef, _ in member.blocks]
+    intercepts = [intercept for member in members for _, intercept in member.blocks]
+    return np.ascontiguousarray(np.vstack(coefs).T), np.concatenate(intercepts)
+
+class FusedScorer:
+    """
+    Fast inference path: the coefficient blocks of every member are stacked
+    into one (n_features x n_outputs) matrix, so the ensemble costs a single
+    sparse x dense product, and isotonic calibration runs through np.interp
+    lookup tables. Differs from the exact path only by float rounding.
+    The stacked matrix is read from the export (`fused` in the manifest) and
+    shared like every other array; exports without it are stacked per process.
+    """
+
+    def __init__(self, members, weights, spec=None, load=None):
+        self.members = members
+        self.weights = weights
+        self.splits = [len(intercept) for member in members for _, intercept in member.blocks]
+        if spec is not None:
+            self.coef, self.intercept = load(spec["coef"]), load(spec["intercept"])
+        else:
+            print("Warning: flat model has no fused matrix (re-export it); building a private copy in this process")
+            self.coef, self.intercept = _stack_blocks(members)
+
+    def classify(self, X):
+        scores = X @ self.coef + self.intercept
+        blocks = np.split(scores, np.cumsum(self.splits)[:-1], axis=1)
+        probas, start = [], 0
+        for member in self.members:
+            count = len(member.blocks)
+            probas.append(member.proba_from_scores(blocks[start:start + count], lookup=True))
+            start += count
+        return np.average(np.asarray(probas), axis=0, weights=self.weights)
+
+class FlatModel:
+    """
+    Drop-in replacement for the pickled pipeline's predict_proba, backed by
+    memory-mapped arrays. Also exposes the feature and ensemble stages separately.
+    """
+
+    def __init__(self, path, mmap=True, fast=False):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FLAT_FORMAT:
+            raise ValueError(f"Unsupported flat model format: {self.manifest.get('format')}")
+
+        mode = 'r' if mmap else None
+        load = lambda filename: np.load(os.path.join(path, filename), mmap_mode=mode)
+
+        self.classes_ = np.asarray(self.manifest["classes"])
+        n_classes = len(self.classes_)
+        self.transformers = [
+            HashingFeatures(spec, load) if spec["kind"] == "hashing" else TfidfFeatures(spec, load)
+            for spec in self.manifest["features"]
+        ]
+        self.members = []
+        for spec in self.manifest["members"]:
+            if spec["kind"] == "logistic":
+                self.members.append(LogisticMember(spec, load))
+            elif spec["kind"] == "multinomial_nb":
+                self.members.append(MultinomialNBMember(spec, load))
+            elif spec["kind"] == "calibrated_linear":
+                self.members.append(CalibratedLinearMember(spec, load, n_classes))
+            else:
+                raise ValueError(f"Unsupported member kind: {spec['kind']}")
+        self.weights = self.manifest.get("weights")
+        self.fused = FusedScorer(self.members, self.weights, self.manifest.get("fused"), load) if fast else None
+
+    def transform(self, texts):
+        blocks = [t.transform(texts) for t in self.transformers]
+        return blocks[0] if len(blocks) == 1 else sp.hstack(blocks, format="csr")
+
+    def classify(self, X):
+        if self.fused is not None:
+            return self.fused.classify(X)
+        probas = np.asarray([member.predict_proba(X) for member in self.members])
+        return np.average(probas, axis=0, weights=self.weights)
+
+    def predict_proba(self, texts):
+        return self.classify(self.transform(texts))
+
+def load_flat_model(path, mmap=True, fast=False):
+    return FlatModel(path, mmap=mmap, fast=fast)
+
+def compare_with_pipeline(pipeline, flat_model, texts):
+    """Max absolute probability difference between the pickle and the flat artifact."""
+    if not texts:
+        return 0.0
+    expected = pipeline.predict_proba(texts)
+    actual = flat_model.predict_proba(texts)
+    return float(np.max(np.abs(expected - actual)))
+
+def time_loads(pickle_path, flat_path, repeat=3):
+    """Best-of-N load time (seconds) of the pickle vs. the flat artifact."""
+    import pickle
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        return min(times)
+
+    def load_pickle():
+        with open(pickle_path, 'rb') as f:
+            pickle.load(f)
+
+    return {"pickle_seconds": best(load_pickle), "flat_seconds": best(lambda: load_flat_model(flat_path))}
+
+def parity_report(pipeline, flat_path, texts):
+    """
+    Max absolute probability deviation of the exact and fused (fast) flat
+    scorers from the original ensemble, plus label agreement and timings.
+    """
+    expected = pipeline.predict_proba(texts)
+    report = {"samples": len(texts), "generated_at": datetime.now(timezone.utc).isoformat()}
+    started = time.perf_counter()
+    pipeline.predict_proba(texts)
+    report["pipeline_seconds"] = time.perf_counter() - started
+    for mode, fast in (("exact", False), ("fused", True)):
+        model = load_flat_model(flat_path, fast=fast)
+        started = time.perf_counter()
+        actual = model.predict_proba(texts)
+        elapsed = time.perf_counter() - started
+        report[mode] = {
+            "max_abs_deviation": float(np.max(np.abs(expected - actual))) if len(texts) else 0.0,
+            "label_agreement": float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1))) if len(texts) else 1.0,
+            "seconds": elapsed,
+        }
+    # Ensemble stage alone, on the same feature matrix
+    X = load_flat_model(flat_path).transform(texts)
+    for mode, fast in (("exact", False), ("fused", True)):
+        model = load_flat_model(flat_path, fast=fast)
+        started = time.perf_counter()
+        model.classify(X)
+        report[mode]["classify_seconds"] = time.perf_counter() - started
+    with open(os.path.join(flat_path, "parity_report.json"), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
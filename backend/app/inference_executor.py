@@ -0,0 +1,178 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from starlette.concurrency import run_in_threadpool
+
+from . import batcher, metrics
+from .ml_utils import initialize_nltk
+from .model_registry import UnknownModelVersion, get_registry
+from .prediction_system import load_word_dictionary, init_nlp
+from .scoring import score_texts, score_texts_detailed
+from .shadow import submit_shadow
+from .startup import in_warmup, warmup_scope
+
+# Number of inference processes; 0 keeps scoring in-process on Starlette's threadpool
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "0"))
+# Smallest slice of a batch request worth shipping to a separate worker
+MIN_CHUNK_SIZE = int(os.environ.get("INFERENCE_MIN_CHUNK", "32"))
+# Longest a warm-up waits for every worker to report in before it fails
+WARM_TIMEOUT = float(os.environ.get("INFERENCE_WARM_TIMEOUT", "300"))
+
+_pool = None
+# Barrier shared with every worker, used at startup (see _on_every_worker); _warm_lock runs one at a time
+_warm_barrier = None
+_warm_lock = threading.Lock()
+# The worker process's handle on _warm_barrier
+_worker_barrier = None
+
+def _init_worker(barrier=None):
+    """Runs once per worker process: load NLTK, the lexicon and the model pipeline."""
+    global _worker_barrier
+    _worker_barrier = barrier
+    # Each worker already owns its whole batch, there is nothing to coalesce
+    batcher.MICRO_BATCHING = False
+    initialize_nltk()
+    load_word_dictionary()
+    init_nlp()
+    get_registry().get()
+
+def _at_barrier(fn, *args):
+    """
+    Run fn in this worker, then wait until every worker has done the same. A
+    worker runs one task at a time, so INFERENCE_WORKERS of these can only pass
+    the barrier once each worker holds exactly one of them.
+    """
+    try:
+        fn(*args)
+    except Exception:
+        # Release the workers already waiting instead of leaving them to time out
+        _worker_barrier.abort()
+        raise
+    _worker_barrier.wait(WARM_TIMEOUT)
+    return os.getpid()
+
+def _on_every_worker(fn, *args):
+    """Run fn(*args) once in each worker process. Returns the worker pids; raises if any worker failed."""
+    with _warm_lock:
+        futures = [_pool.submit(_at_barrier, fn, *args) for _ in range(INFERENCE_WORKERS)]
+        wait(futures, timeout=WARM_TIMEOUT * 2)
+        try:
+            pids = [f.result(timeout=0) for f in futures]
+        finally:
+            if _warm_barrier.broken:
+                _warm_barrier.reset()
+    if len(set(pids)) != INFERENCE_WORKERS:
+        raise RuntimeError(f"Only {len(set(pids))} of {INFERENCE_WORKERS} inference workers reported in")
+    return pids
+
+def _warm_version(version):
+    """Load a model version in this worker and score the warm-up texts once."""
+    from .startup import WARMUP_TEXTS
+    with warmup_scope():
+        score_texts(WARMUP_TEXTS, get_registry().get(version))
+    return os.getpid()
+
+def warm_pool_version(version):
+    """
+    Preload `version` in the workers before the registry swaps to it, one
+    independent task per worker. Workers keep serving live requests between
+    tasks, so an activation never holds the whole pool; a worker that didn't
+    pick up a task loads the version on its first request for it. Raises when
+    a warm-up task fails, so the swap doesn't happen.
+    """
+    if _pool is None:
+        return []
+    futures = [_pool.submit(_warm_version, version) for _ in range(INFERENCE_WORKERS)]
+    pids = [f.result(timeout=WARM_TIMEOUT) for f in futures]
+    print(f"Model {version} preloaded in {len(set(pids))} of {INFERENCE_WORKERS} inference worker(s).")
+    return pids
+
+def _score(texts, version=None, warmup=False, active=None):
+    """
+    Full scoring path; runs in a worker process or on the local threadpool.
+    version=None scores with the active model. warmup=True is carried across
+    explicitly because the caller's warm-up scope doesn't reach other processes,
+    and `active` is the API process's active version, which workers follow.
+    """
+    with metrics.recording() as samples:
+        registry = get_registry()
+        if active is not None:
+            registry.follow(active)
+        model = registry.get(version)
+        if not model:
+            return None
+        if warmup:
+            with warmup_scope():
+                scored = score_texts_detailed(texts, model)
+        else:
+            scored = score_texts_detailed(texts, model)
+    return scored._replace(samples=samples)
+
+def start_inference_pool():
+    """Start the process pool (if configured) and block until every worker has loaded the model."""
+    global _pool, _warm_barrier
+    if INFERENCE_WORKERS <= 0 or _pool is not None:
+        return _pool
+    # spawn, not fork: the API process already runs threads (event loop, batcher, threadpool)
+    context = multiprocessing.get_context("spawn")
+    _warm_barrier = context.Barrier(INFERENCE_WORKERS)
+    _pool = ProcessPoolExecutor(
+        max_workers=INFERENCE_WORKERS,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(_warm_barrier,),
+    )
+    # Every worker process has started and run _init_worker once this returns
+    pids = set(_on_every_worker(os.getpid))
+    print(f"Inference pool ready with {len(pids)} worker process(es).")
+    return _pool
+
+def shutdown_inference_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+def pool_enabled():
+    return _pool is not None
+
+async def score_texts_async(texts, model_version=None):
+    """
+    Score texts without blocking the event loop, with the active model or a pinned version.
+    Returns None when the model is unavailable, mirroring get_model();
+    raises UnknownModelVersion for a pinned version the registry doesn't have.
+    """
+    registry = get_registry()
+    if model_version is not None and not registry.has_version(model_version):
+        raise UnknownModelVersion(model_version)
+    warmup = in_warmup()
+    if _pool is None:
+        scored = await run_in_threadpool(_score, texts, model_version, warmup)
+        if scored is None:
+            return None
+        metrics.replay(scored.samples)
+        if warmup:
+            return scored.results
+        submit_shadow(scored.results[0]["model_version"] if scored.results else None,
+                      scored.model_inputs, scored.probs, scored.model_seconds)
+        return scored.results
+
+    # Workers have no notion of the API's active version; resolve it here
+    version = model_version or registry.active_version
+
+    loop = asyncio.get_running_loop()
+    chunk_size = max(MIN_CHUNK_SIZE, math.ceil(len(texts) / INFERENCE_WORKERS))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)] or [texts]
+    active = registry.active_version
+    parts = await asyncio.gather(*(loop.run_in_executor(_pool, _score, chunk, version, warmup, active) for chunk in chunks))
+    if any(part is None for part in parts):
+        return None
+    for part in parts:
+        metrics.replay(part.samples)
+        if not warmup:
+            submit_shadow(version, part.model_inputs, part.probs, part.model_seconds)
+    return [result for part in parts for result in part.results]
@@ -0,0 +1,117 @@
+from collections import deque
+
+# Every fixed keyword list used by the rule layer, compiled into one automaton.
+# whole_word=True mirrors the old \b...\b regex checks; False is a plain substring test.
+RISK_PHRASES = [
+    "kill myself", "suicide", "end my life", "end it all", "self harm",
+    "want to die", "commit suicide", "hurt myself", "taking my life",
+    "no reason to live", "carbon monoxide", "overdose", "cut my wrist",
+    "goodbye world", "last note"
+]
+ANXIETY_SIGNALS = ['fear', 'nervous', 'anxious', 'scared', 'judged', 'judge', 'watching', 'uncomfortable', 'crowds', 'crowded', 'panic', 'heart', 'racing', 'shaking', 'social', 'presentation', 'public', 'weird', 'awkward', 'embarrassed', 'sweat', 'overwhelmed']
+POSITIVE_SIGNALS = ['happy', 'good', 'well', 'relaxed', 'calm', 'fine', 'ok']
+NEGATIVE_SIGNALS = ['sad', 'bad', 'depressed', 'hurt', 'pain', 'stress', 'worried']
+DIRECT_TRIGGERS = ['judged', 'judge', 'watching', 'panic', 'heart', 'racing', 'shaking', 'crowded', 'sweat', 'awkward', 'embarrassed']
+DISTRESS_KEYWORDS = ['crying', "can't stop", 'breakdown', 'pain', 'hurt']
+POSITIVE_KEYWORDS = ['happy', 'calm', 'relaxed', 'confident', 'peaceful']
+
+LEXICONS = {
+    # category: (phrases, whole_word)
+    "risk": (RISK_PHRASES, False),
+    "anxiety_signal": (ANXIETY_SIGNALS, True),
+    "positive_signal": (POSITIVE_SIGNALS, True),
+    "negative_signal": (NEGATIVE_SIGNALS, True),
+    "direct_trigger": (DIRECT_TRIGGERS, True),
+    "distress": (DISTRESS_KEYWORDS, False),
+    "positive_keyword": (POSITIVE_KEYWORDS, False),
+}
+
+_matcher = None
+
+def _is_word_char(ch):
+    # Same definition as \w for str patterns in the re module
+    return ch.isalnum() or ch == '_'
+
+class MultiPatternMatcher:
+    """
+    Aho-Corasick automaton over every lexicon phrase.
+    One left-to-right pass over the text reports all (possibly overlapping) hits,
+    so the cost depends on the text length, not on how many phrases are loaded.
+    """
+
+    def __init__(self, lexicons):
+        self.categories = list(lexicons)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]  # node -> [(category, phrase index, phrase length, whole_word)]
+        self._phrases = {}
+
+        for category, (phrases, whole_word) in lexicons.items():
+            self._phrases[category] = list(phrases)
+            for index, phrase in enumerate(phrases):
+                self._add(phrase.lower(), (category, index, len(phrase), whole_word))
+        self._build_failure_links()
+
+    def _add(self, phrase, output):
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(output)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                # Inherit matches that end at the failure state (suffix phrases)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, text_lower):
+        """
+        Returns {category: [phrase, ...]} for every category, each list in lexicon
+        order without duplicates. text_lower must already be lowercased.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        found = {category: set() for category in self.categories}
+        state = 0
+        last = len(text_lower) - 1
+        for i, ch in enumerate(text_lower):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            for category, index, length, whole_word in out[state]:
+                if whole_word:
+                    start = i - length + 1
+                    if start > 0 and _is_word_char(text_lower[start - 1]):
+                        continue
+                    if i < last and _is_word_char(text_lower[i + 1]):
+                        continue
+                found[category].add(index)
+        return {
+            category: [self._phrases[category][index] for index in sorted(hits)]
+            for category, hits in found.items()
+        }
+
+def get_matcher():
+    """Build the shared automaton once per process."""
+    global _matcher
+    if _matcher is None:
+        _matcher = MultiPatternMatcher(LEXICONS)
+    return _matcher
+
+def scan_text(text_lower):
+    return get_matcher().scan(text_lower)
@@ -1,49 +1,69 @@
-from fastapi import FastAPI, HTTPException, Request
+# Imported first so the startup report covers the cost of the imports below
+from .startup import STARTUP_MODE, tracker as startup_tracker, run_startup
+
+from fastapi import FastAPI, HTTPException, Request, Response, Query
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+import base64
 import json
 import os
-from datetime import datetime
+from typing import Optional
 
 # Adjust module imports
-from .database import init_db, get_connection
-from .models import PredictRequest, PredictResponse, HistoryItem
-from .prediction_system import predict_with_words
+from .database import pooled_connection, get_pool, close_pool, delete_prediction
+from .models import PredictRequest, BatchPredictRequest, PredictResponse, HistoryItem
+from .scoring import to_db_row
+from .batcher import get_batcher, close_batcher
+from .prediction_cache import get_prediction_cache
+from .word_lexicon import get_lexicon_index, LEXICON_FILES, LEXICON_CHECK_INTERVAL
+from .write_behind import get_write_queue, persist_predictions, flush_pending_writes, close_write_queue
+from .inference_executor import shutdown_inference_pool, score_texts_async, warm_pool_version, pool_enabled
+from .model_registry import get_registry, UnknownModelVersion
+from .shadow import get_shadow, start_shadow, stop_shadow
+from . import metrics
+from .profiling import PROFILING, profile_mode, profile_predict
 
-# Use existing ml_utils to load the pickle model and clean text
-from .ml_utils import get_model, clean_text, initialize_nltk
+# Largest page /history will serve in one call
+HISTORY_MAX_PAGE_SIZE = 100
+# Lines scored per model call by /predict/stream
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", "256"))
+# Longest single line /predict/stream buffers before rejecting the upload with 413
+STREAM_MAX_LINE_BYTES = int(os.environ.get("STREAM_MAX_LINE_BYTES", str(1024 * 1024)))
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+startup_tracker.record("imports", startup_tracker.elapsed())
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    logger.info("Starting Social Anxiety API...")
-    try:
-        logger.info("Initializing database...")
-        init_db()
-        logger.info("Database initialized.")
-        
-        logger.info("Initializing NLTK components...")
-        initialize_nltk()
-        logger.info("NLTK components initialized.")
-        
-        logger.info("Loading ML model...")
-        model = get_model()
-        if model:
-            logger.info("ML model loaded successfully.")
-        else:
-            logger.warning("ML model failed to load during startup.")
-    except Exception as e:
-        logger.error(f"Error during startup: {e}", exc_info=True)
+    logger.info(f"Starting Social Anxiety API ({STARTUP_MODE} startup)...")
+    warmup_task = None
+    if STARTUP_MODE == "background":
+        # Bind the port now; /readyz turns 200 once loading and warm-up finish
+        warmup_task = asyncio.create_task(run_startup())
+    else:
+        await run_startup()
+    startup_tracker.mark_serving()
     
     yield
     # Shutdown
     logger.info("Shutting down Social Anxiety API...")
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    close_batcher()
+    stop_shadow()
+    shutdown_inference_pool()
+    # Commit any write-behind rows before the process exits
+    close_write_queue()
+    close_pool()
 
 app = FastAPI(title="Social Anxiety Prediction API", lifespan=lifespan)
 
@@ -53,73 +73,368 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/")
 def read_root():
     return {"message": "Social Anxiety API running with Hybrid Word-Scoring system."}
 
-@app.post("/predict", response_model=PredictResponse)
-def predict_endpoint(request: PredictRequest):
-    model = get_model()
-    if not model:
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving HTTP."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: model and lexicons are loaded and the warm-up pass has completed."""
+    if not startup_tracker.ready:
+        return JSONResponse(status_code=503, content={"status": "starting", "error": startup_tracker.error})
+    return {"status": "ready"}
+
+@app.get("/admin/startup")
+def startup_report():
+    """Per-phase startup timings (imports, database, NLTK, lexicons, model, warm-up)."""
+    return startup_tracker.report()
+
+async def _score_or_raise(texts, model_version=None):
+    """score_texts_async with the API's HTTP errors for a missing model or an unknown pinned version."""
+    try:
+        results = await score_texts_async(texts, model_version)
+    except UnknownModelVersion:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {model_version}")
+    if results is None:
         raise HTTPException(status_code=500, detail="ML Model not loaded.")
+    return results
 
-    # 1. Base ML Prediction
-    text_lower = request.text.lower()
-    cleaned = clean_text(text_lower)
-    
-    if not cleaned:
-        probs = [1.0, 0.0, 0.0] # Failsafe
-    else:
-        probs = model.predict_proba([cleaned])[0]
-        
-    pred_idx = np.argmax(probs)
-    ml_conf = float(np.max(probs))
-    
-    label_map = {0: "Low Anxiety", 1: "Moderate Anxiety", 2: "High Anxiety"}
-    ml_prediction = label_map[pred_idx]
-    
-    # 2. Enhanced Word Scoring Pass
-    final_output = predict_with_words(request.text, ml_prediction, ml_conf)
-    
-    # Format DB saving details depending on output
-    pred_val = final_output.get("prediction", "Uncertain")
-    conf_val = final_output.get("confidence", 0.0)
-    dw_val = json.dumps(final_output.get("detected_words", []))
-    
-    # If the response doesn't have a generated timestamp due to Uncertain fallback, make one
-    ts_val = final_output.get("timestamp", datetime.utcnow().isoformat())
+async def _profiled_predict(request, mode):
+    """/predict through profiling.profile_predict; `timings` is added to the body only when asked for."""
+    if request.model_version is not None and not get_registry().has_version(request.model_version):
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {request.model_version}")
+    final_output, timings = await run_in_threadpool(profile_predict, request.text, request.model_version)
+    if final_output is None:
+        raise HTTPException(status_code=500, detail="ML Model not loaded.")
+    if mode != "timings":
+        return final_output
+    body = jsonable_encoder(PredictResponse(**final_output))
+    body["timings"] = timings
+    return JSONResponse(body)
+
+@app.post("/predict", response_model=PredictResponse)
+async def predict_endpoint(request: PredictRequest, http_request: Request):
+    if PROFILING:
+        mode = profile_mode(http_request)
+        if mode is not None:
+            return await _profiled_predict(request, mode)
+
+    # 1. Base ML Prediction + 2. Enhanced Word Scoring Pass
+    # (threadpool or inference process pool, depending on INFERENCE_WORKERS)
+    results = await _score_or_raise([request.text], request.model_version)
+    final_output = results[0]
 
     # 3. Save to SQLite Database
-    conn = get_connection()
-    if conn:
-        try:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO predictions (text, prediction, confidence, detected_words, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """, (request.text, pred_val, conf_val, dw_val, ts_val))
-            conn.commit()
-        except Exception as e:
-            print(f"Error saving to SQLite: {e}")
-        finally:
-            conn.close()
+    await run_in_threadpool(persist_predictions, [to_db_row(request.text, final_output)])
 
     return final_output
 
+@app.post("/predict/batch", response_model=list[PredictResponse])
+async def predict_batch_endpoint(request: BatchPredictRequest):
+    """Scores a list of texts with one vectorized model call and one DB transaction."""
+    results = await _score_or_raise(request.texts, request.model_version)
+
+    rows = [to_db_row(text, out) for text, out in zip(request.texts, results)]
+    await run_in_threadpool(persist_predictions, rows)
+
+    return results
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that never reads from `receive`.
+    The stock class listens for disconnects on older ASGI servers, which would
+    swallow request body chunks the streaming endpoint is still consuming.
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def _line_too_long():
+    return HTTPException(status_code=413, detail=f"Line exceeds STREAM_MAX_LINE_BYTES ({STREAM_MAX_LINE_BYTES} bytes).")
+
+async def _iter_body_lines(request):
+    """
+    Yield raw lines from the request body as they arrive. The partial line is
+    kept as a list of chunks and joined once, when its newline arrives;
+    raises 413 when it grows past STREAM_MAX_LINE_BYTES.
+    """
+    parts = []
+    size = 0
+    async for chunk in request.stream():
+        *lines, tail = chunk.split(b"\n")
+        for piece in lines:
+            if size + len(piece) > STREAM_MAX_LINE_BYTES:
+                raise _line_too_long()
+            parts.append(piece)
+            yield b"".join(parts)
+            parts = []
+            size = 0
+        if tail:
+            size += len(tail)
+            if size > STREAM_MAX_LINE_BYTES:
+                raise _line_too_long()
+            parts.append(tail)
+    if parts:
+        yield b"".join(parts)
+
+def _parse_stream_line(raw):
+    """Accept either an NDJSON object with a "text" field or a plain text line."""
+    line = raw.decode("utf-8", errors="replace").rstrip("\r")
+    if not line.strip():
+        return None
+    if line.lstrip().startswith("{"):
+        try:
+            text = json.loads(line)["text"]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Expected a JSON object with a \"text\" field.")
+        if not isinstance(text, str):
+            raise ValueError("\"text\" must be a string.")
+        return text
+    return line
+
+@app.post("/predict/stream")
+async def predict_stream_endpoint(request: Request, persist: bool = False, model_version: Optional[str] = None):
+    """
+    Scores a newline-delimited upload (NDJSON {"text": ...} objects or plain
+    text lines) in fixed-size chunks and streams NDJSON results back as each
+    chunk completes. Memory stays bounded by STREAM_CHUNK_SIZE regardless of
+    upload size. Results are only saved to history when persist=true.
+    model_version pins a registry version for the whole upload. Errors raised
+    before the first chunk is scored (unknown version, a line over
+    STREAM_MAX_LINE_BYTES) get their HTTP status; later ones end the stream
+    with an {"error": ...} line.
+    """
+    async def results():
+        chunk = []  # (line_number, text)
+
+        async def flush():
+            outputs = await _score_or_raise([text for _, text in chunk], model_version)
+            if persist:
+                rows = [to_db_row(text, out) for (_, text), out in zip(chunk, outputs)]
+                await run_in_threadpool(persist_predictions, rows)
+            lines = [json.dumps({"line": line_no, **out}) for (line_no, _), out in zip(chunk, outputs)]
+            chunk.clear()
+            return "\n".join(lines) + "\n"
+
+        line_no = 0
+        async for raw in _iter_body_lines(request):
+            line_no += 1
+            try:
+                text = _parse_stream_line(raw)
+            except ValueError as e:
+                yield json.dumps({"line": line_no, "error": str(e)}) + "\n"
+                continue
+            if text is None:
+                continue
+            chunk.append((line_no, text))
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield await flush()
+        if chunk:
+            yield await flush()
+
+    stream = results()
+    # Produce the first piece before the status line is sent, so early errors are real HTTP errors
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def body():
+        if first is not None:
+            yield first
+        try:
+            async for part in stream:
+                yield part
+        except HTTPException as e:
+            yield json.dumps({"error": e.detail}) + "\n"
+
+    return NDJSONStreamingResponse(body())
+
+@app.get("/admin/batcher")
+def get_batcher_stats():
+    """Queue depth and batch-size stats for tuning the micro-batching window."""
+    batcher = get_batcher()
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+@app.get("/admin/cache")
+def get_cache_stats():
+    """Hit/miss/eviction counters for sizing the prediction cache."""
+    cache = get_prediction_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/admin/write-queue")
+def get_write_queue_stats():
+    """Depth and throughput of the write-behind persistence queue."""
+    queue = get_write_queue()
+    if queue is None:
+        return {"enabled": False}
+    return {"enabled": True, **queue.stats()}
+
+@app.get("/admin/lexicon")
+def get_lexicon_stats():
+    """Version and entry counts of the word lexicon currently used by /predict."""
+    index = get_lexicon_index()
+    return {
+        **index.stats(),
+        "check_interval_seconds": LEXICON_CHECK_INTERVAL,
+        "files": {label: os.path.basename(path) for label, path in LEXICON_FILES.items()},
+    }
+
+@app.get("/admin/models")
+def get_models():
+    """Discovered model versions (checksum, training date, metrics), the active one and what is loaded."""
+    return get_registry().status()
+
+@app.post("/admin/models/{version}/activate", status_code=202)
+def activate_model(version: str):
+    """
+    Load and warm `version` in the background, then atomically make it the default
+    for unpinned requests. Poll GET /admin/models for the activation state.
+    """
+    registry = get_registry()
+    try:
+        # With inference workers the swap waits for them to load the version instead
+        return registry.activate(version, warm=warm_pool_version if pool_enabled() else None)
+    except UnknownModelVersion:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {version}")
+
+@app.get("/admin/shadow")
+def get_shadow_summary():
+    """Rolling agreement, probability deltas and latency of the shadow (candidate) model vs. the primary."""
+    shadow = get_shadow()
+    if shadow is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow.summary()}
+
+@app.post("/admin/shadow/{version}")
+def enable_shadow(version: str):
+    """Start shadow-scoring live traffic with `version`; resets the summary."""
+    if not get_registry().has_version(version):
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {version}")
+    start_shadow(version)
+    return {"enabled": True, "shadow_version": version}
+
+@app.delete("/admin/shadow")
+def disable_shadow():
+    stop_shadow()
+    return {"enabled": False}
+
+def _runtime_metrics():
+    """Gauges and counters read from the batcher, cache, write queue, DB pool, shadow scorer and startup tracker."""
+    families = []
+    batcher = get_batcher()
+    if batcher is not None:
+        stats = batcher.stats()
+        families.append(("anxiety_batcher_queue_depth", "gauge", "Requests waiting in the micro-batcher.",
+                         [({}, stats["queue_depth"])]))
+        families.append(("anxiety_batcher_queued_rows", "gauge", "Rows waiting in the micro-batcher.",
+                         [({}, stats["queued_rows"])]))
+    # With inference workers each worker has its own cache; this process's stays empty
+    cache = get_prediction_cache() if not pool_enabled() else None
+    if cache is not None:
+        stats = cache.stats()
+        families.append(("anxiety_prediction_cache_entries", "gauge", "Probability rows in the prediction cache.",
+                         [({}, stats["entries"])]))
+        families.append(("anxiety_prediction_cache_lookups_total", "counter", "Prediction cache lookups by result.",
+                         [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])]))
+    queue = get_write_queue()
+    if queue is not None:
+        stats = queue.stats()
+        families.append(("anxiety_write_queue_rows", "gauge", "Write-behind rows by state.",
+                         [({"state": "queued"}, stats["queued_rows"]), ({"state": "inflight"}, stats["inflight_rows"])]))
+        families.append(("anxiety_write_queue_capacity_rows", "gauge", "Write-behind queue capacity.",
+                         [({}, stats["max_rows"])]))
+        families.append(("anxiety_write_queue_dropped_rows_total", "counter",
+                         "Write-behind rows dropped after every write attempt failed.",
+                         [({}, stats["rows_dropped"])]))
+    stats = get_pool().stats()
+    families.append(("anxiety_db_connections", "gauge", "Pooled SQLite connections by state.",
+                     [({"state": "in_use"}, stats["in_use"]), ({"state": "idle"}, stats["idle"])]))
+    families.append(("anxiety_db_connections_max", "gauge", "SQLite connection pool size.",
+                     [({}, stats["max_size"])]))
+    shadow = get_shadow()
+    if shadow is not None:
+        summary = shadow.summary()
+        families.append(("anxiety_shadow_pending_batches", "gauge", "Shadow batches in flight.",
+                         [({"version": shadow.version}, summary["pending_batches"])]))
+        families.append(("anxiety_shadow_rows_total", "counter", "Shadow rows by outcome.",
+                         [({"version": shadow.version, "outcome": k.replace("_rows", "")}, summary[k])
+                          for k in ("compared_rows", "dropped_rows", "sampled_out_rows")]))
+    startup = startup_tracker.report()
+    families.append(("anxiety_startup_phase_seconds", "gauge", "Seconds spent in each startup phase.",
+                     [({"phase": p["name"]}, p["seconds"]) for p in startup["phases"]]))
+    families.append(("anxiety_ready", "gauge", "1 once startup and warm-up have finished.",
+                     [({}, int(startup["ready"]))]))
+    return families
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition: per-stage latency histograms, prediction counters and runtime gauges."""
+    return Response(metrics.render(_runtime_metrics()), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/admin/db-pool")
+def get_db_pool_stats():
+    """Open, idle and in-use SQLite connections."""
+    return get_pool().stats()
+
+def encode_history_cursor(last_id):
+    """Opaque cursor pointing just past the last row of a /history page."""
+    payload = json.dumps({"before_id": last_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_history_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["before_id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid history cursor.")
+
 @app.get("/history", response_model=list[HistoryItem])
-def get_history():
-    """Returns the last 20 predictions from the database."""
-    conn = get_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Database connection error.")
-        
+def get_history(
+    response: Response,
+    limit: int = Query(20, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    before_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+):
+    """
+    Returns predictions newest-first, `limit` rows per page (last 20 by default).
+    Pages are keyset-paginated on the id primary key, so every page costs the
+    same regardless of table size. The cursor for the next page is returned in
+    the X-Next-Cursor header and can be passed back as `cursor`.
+    """
+    if cursor is not None:
+        before_id = decode_history_cursor(cursor)
+
+    flush_pending_writes()
     try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM predictions ORDER BY id DESC LIMIT 20")
-        rows = cur.fetchall()
-        
+        with metrics.stage("history_query"), pooled_connection() as conn:
+            cur = conn.cursor()
+            # One extra row tells us whether another page exists
+            if before_id is None:
+                cur.execute("SELECT * FROM predictions ORDER BY id DESC LIMIT ?", (limit + 1,))
+            else:
+                cur.execute("SELECT * FROM predictions WHERE id < ? ORDER BY id DESC LIMIT ?", (before_id, limit + 1))
+            rows = cur.fetchall()
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = encode_history_cursor(rows[-1]["id"])
+            
         history_list = []
         for row in rows:
             history_list.append({
@@ -128,47 +443,55 @@ def get_history():
                 "prediction": row["prediction"],
                 "confidence": row["confidence"],
                 "detected_words": json.loads(row["detected_words"]),
-                "timestamp": row["timestamp"]
+                "timestamp": row["timestamp"],
+                "model_version": row["model_version"]
             })
         return history_list
     except Exception as e:
         print(f"Error fetching SQLite history: {e}")
         return []
-    finally:
-        conn.close()
 
 @app.delete("/history/{item_id}")
 def delete_history_item(item_id: int):
     """Deletes a specific prediction from the database."""
-    conn = get_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Database connection error.")
-        
     try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM predictions WHERE id = ?", (item_id,))
-        if cur.rowcount == 0:
-            raise HTTPException(status_code=404, detail="Item not found.")
-        conn.commit()
+        with pooled_connection() as conn:
+            if not delete_prediction(conn, item_id):
+                raise HTTPException(status_code=404, detail="Item not found.")
         return {"message": "Conversation deleted successfully."}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error deleting history item: {e}")
         raise HTTPException(status_code=500, detail="Internal server error.")
-    finally:
-        conn.close()
 
 @app.get("/insights")
 def get_insights():
-    """Aggregates anxiety levels and daily trends for visualization."""
-    conn = get_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Database connection error.")
+    """
+    Aggregates anxiety levels and daily trends for visualization.
+    Reads the daily_prediction_stats rollup, so the cost grows with days, not rows.
+    """
+    flush_pending_writes()
     try:
-        cur = conn.cursor()
-        
-        # 1. Total Distribution
-        cur.execute("SELECT prediction, COUNT(*) as count FROM predictions GROUP BY prediction")
-        dist_rows = cur.fetchall()
+        with metrics.stage("insights_query"), pooled_connection() as conn:
+            cur = conn.cursor()
+            
+            # 1. Total Distribution
+            cur.execute("SELECT prediction, SUM(count) as count FROM daily_prediction_stats GROUP BY prediction")
+            dist_rows = cur.fetchall()
+
+            # 2. Daily Trends (Variation over time)
+            cur.execute("""
+                SELECT day, 
+                       SUM(CASE WHEN prediction = 'High Anxiety' THEN count ELSE 0 END) as High,
+                       SUM(CASE WHEN prediction = 'Moderate Anxiety' THEN count ELSE 0 END) as Moderate,
+                       SUM(CASE WHEN prediction = 'Low Anxiety' THEN count ELSE 0 END) as Low
+                FROM daily_prediction_stats 
+                GROUP BY day 
+                ORDER BY day ASC
+                LIMIT 14
+            """)
+            trend_rows = cur.fetchall()
         
         distribution = []
         for row in dist_rows:
@@ -177,20 +500,6 @@ def get_insights():
                 "_id": label,
                 "count": row["count"]
             })
-
-        # 2. Daily Trends (Variation over time)
-        # Using SQLite date() function to group by day
-        cur.execute("""
-            SELECT date(timestamp) as day, 
-                   COUNT(CASE WHEN prediction = 'High Anxiety' THEN 1 END) as High,
-                   COUNT(CASE WHEN prediction = 'Moderate Anxiety' THEN 1 END) as Moderate,
-                   COUNT(CASE WHEN prediction = 'Low Anxiety' THEN 1 END) as Low
-            FROM predictions 
-            GROUP BY day 
-            ORDER BY day ASC
-            LIMIT 14
-        """)
-        trend_rows = cur.fetchall()
         
         trends = []
         for row in trend_rows:
@@ -208,8 +517,6 @@ def get_insights():
     except Exception as e:
         print(f"Error calculating insights: {e}")
         return {"anxiety_distribution": [], "daily_trends": []}
-    finally:
-        conn.close()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,183 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from .startup import in_warmup
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; spans sub-millisecond cleaning up to multi-second batch scoring
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_metrics = {}
+_local = threading.local()
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _metrics[name] = self
+
+    def _key(self, labels):
+        return tuple((name, labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _apply(self, key, amount):
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def inc(self, amount=1, **labels):
+        _record(self, self._key(labels), amount)
+
+    def lines(self):
+        return [f"{self.name}{_format_labels(key)} {_format_value(v)}" for key, v in sorted(self._values.items())]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _apply(self, key, value):
+        self._values[key] = value
+
+    def set(self, value, **labels):
+        _record(self, self._key(labels), value)
+
+    def lines(self):
+        return [f"{self.name}{_format_labels(key)} {_format_value(v)}" for key, v in sorted(self._values.items())]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _apply(self, key, value):
+        series = self._values.get(key)
+        if series is None:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        series[1] += value
+        series[2] += 1
+
+    def observe(self, value, **labels):
+        _record(self, self._key(labels), value)
+
+    def lines(self):
+        out = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                out.append(f"{self.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {cumulative}")
+            out.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            out.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return out
+
+def _record(metric, key, value):
+    buffer = getattr(_local, "buffer", None)
+    if buffer is not None:
+        buffer.append((metric.name, key, value))
+        return
+    with _lock:
+        metric._apply(key, value)
+
+@contextmanager
+def recording():
+    """
+    Buffer the metric updates made on this thread instead of applying them.
+    Inference workers run their scoring under this and ship the buffer back
+    with the results, so the API process (which serves /metrics) sees them.
+    """
+    previous = getattr(_local, "buffer", None)
+    samples = []
+    _local.buffer = samples
+    try:
+        yield samples
+    finally:
+        _local.buffer = previous
+
+def replay(samples):
+    """Apply updates captured by recording(), possibly in another process."""
+    if not samples:
+        return
+    with _lock:
+        for name, key, value in samples:
+            metric = _metrics.get(name)
+            if metric is not None:
+                metric._apply(tuple(tuple(pair) for pair in key), value)
+
+@contextmanager
+def stage(name):
+    """Time a block into the per-stage latency histogram (skipped during warm-up)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if not in_warmup():
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage=name)
+
+def render(extra=()):
+    """
+    Prometheus text exposition of every registered metric plus `extra`,
+    an iterable of (name, kind, help, [(labels dict, value), ...]) read at scrape time.
+    """
+    lines = []
+    with _lock:
+        for metric in _metrics.values():
+            body = metric.lines()
+            if body:
+                lines.extend(metric.header())
+                lines.extend(body)
+    for name, kind, help_text, samples in extra:
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+STAGE_SECONDS = Histogram(
+    "anxiety_stage_seconds",
+    "Time spent in each stage of the prediction path and the history/insights queries.",
+    ["stage"],
+)
+PREDICTIONS = Counter(
+    "anxiety_predictions_total",
+    "Scored texts by final label and by the rule that decided it.",
+    ["prediction", "path"],
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "anxiety_model_load_seconds",
+    "Seconds the last load of each model version took in the API process.",
+    ["version", "format"],
+)
@@ -1,23 +1,47 @@
 import os
 import re
-import pickle
 import random
-import numpy as np
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
 from datetime import datetime
 from dotenv import load_dotenv
 
+from .lexicon_matcher import scan_text
+
 # Specific imports deferred to avoid startup latency
-# import nltk, sklearn etc. are handled inside initialize_nltk and get_model
+# import nltk, sklearn, numpy etc. are handled inside initialize_nltk, get_model and the scoring functions
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
 
 # Lazy-load artifacts
 MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ml_models", "nlp_anxiety_model_v6.pkl")
+# "flat" serves the memory-mapped export of each pickle (train_nlp_model.py --export-flat) when present
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "pickle")
+# With the flat model: score all ensemble members with one fused matmul (see parity_report.json)
+FAST_INFERENCE = os.environ.get("FAST_INFERENCE", "0") == "1"
+# Precomputed WordNet lemmas (built by build_lemma_table.py in the repo root)
+LEMMA_TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ml_models", "lemma_table.tsv")
 
-_model = None
 lemmatizer = None
 stop_words = None
+_lemma_table = None
+# While WordNet is unavailable, the time after which downloading it is tried again
+_wordnet_retry_at = 0.0
+# Seconds between download attempts when WordNet is missing
+WORDNET_RETRY_INTERVAL = 60.0
+# WordNet's lazy corpus loader is not safe to first-touch from several threads
+_wordnet_lock = threading.Lock()
+
+# Precompiled cleaning patterns shared by the model input and word-scoring token streams
+_URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+_HTML_PATTERN = re.compile(r'<.*?>')
+_ALPHA_TOKEN_PATTERN = re.compile(r'[a-zA-Z]+')
+_WORD_TOKEN_PATTERN = re.compile(r"[\w']+")
+
+PreprocessedText = namedtuple("PreprocessedText", ["text_lower", "model_input", "word_tokens"])
 
 def initialize_nltk():
     """Download NLTK data if not already present."""
@@ -29,7 +53,9 @@ def initialize_nltk():
         
         try:
             nltk.data.find('corpora/stopwords')
-            nltk.data.find('corpora/wordnet')
+            # With a lemma table WordNet is only a fallback for unseen tokens
+            if not load_lemma_table():
+                nltk.data.find('corpora/wordnet')
         except LookupError:
             nltk.download('stopwords', quiet=True)
             nltk.download('wordnet', quiet=True)
@@ -41,53 +67,127 @@ def initialize_nltk():
         print(f"Error initializing NLTK: {e}")
         return False
 
+def get_lemmatizer():
+    """Shared WordNet lemmatizer, created on first use when initialize_nltk() didn't run."""
+    global lemmatizer
+    if lemmatizer is None:
+        import nltk
+        from nltk.stem import WordNetLemmatizer
+        try:
+            nltk.data.find('corpora/wordnet')
+        except LookupError:
+            nltk.download('wordnet', quiet=True)
+        lemmatizer = WordNetLemmatizer()
+    return lemmatizer
+
+def load_lemma_table():
+    """
+    Load the precomputed token -> lemma table, once. Each line is either
+    "token<TAB>lemma" or just "token" when the lemma is the token itself.
+    Returns an empty dict when the table hasn't been built.
+    """
+    global _lemma_table
+    if _lemma_table is None:
+        table = {}
+        if os.path.exists(LEMMA_TABLE_PATH):
+            with open(LEMMA_TABLE_PATH, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('#'):
+                        continue
+                    token, _, lemma = line.rstrip('\n').partition('\t')
+                    table[token] = lemma or token
+        _lemma_table = table
+    return _lemma_table
+
+class WordNetUnavailable(LookupError):
+    pass
+
+def _wordnet_lemma(token):
+    """
+    WordNet lemma for a token missing from the lemma table. With a lemma table,
+    initialize_nltk() skips the WordNet download, so it is fetched here on the
+    first fallback. Raises WordNetUnavailable when it can't be loaded.
+    """
+    global _wordnet_retry_at
+    with _wordnet_lock:
+        if time.monotonic() < _wordnet_retry_at:
+            raise WordNetUnavailable(token)
+        try:
+            return get_lemmatizer().lemmatize(token)
+        except LookupError:
+            pass
+        try:
+            import nltk
+            nltk.download('wordnet', quiet=True)
+            return get_lemmatizer().lemmatize(token)
+        except Exception as e:
+            _wordnet_retry_at = time.monotonic() + WORDNET_RETRY_INTERVAL
+            print(f"Error: WordNet unavailable, tokens missing from the lemma table are not lemmatized "
+                  f"and model input will differ from training until it is installed: {e}")
+            raise WordNetUnavailable(token)
+
+@lru_cache(maxsize=65536)
+def _cached_lemma(token):
+    # Exceptions are not cached, so a token seen while WordNet was missing is retried later
+    lemma = load_lemma_table().get(token)
+    if lemma is not None:
+        return lemma
+    return _wordnet_lemma(token)
+
+def lemmatize_token(token):
+    """
+    Memoized noun lemma. Tokens covered by the lemma table never touch WordNet;
+    unseen tokens fall back to the WordNet lemmatizer. While WordNet is missing
+    the raw token is returned but never cached.
+    """
+    try:
+        return _cached_lemma(token)
+    except WordNetUnavailable:
+        return token
+
 def get_model():
-    """Lazy-load the ensemble model."""
-    global _model
-    if _model is None:
-        initialize_nltk()
-        if os.path.exists(MODEL_PATH):
-            print(f"Loading pipeline from {MODEL_PATH}...")
-            with open(MODEL_PATH, 'rb') as f:
-                _model = pickle.load(f)
-            print("Ensemble pipeline loaded successfully.")
-        else:
-            print(f"Warning: Model not found at {MODEL_PATH}")
-    return _model
+    """Active model from the registry (lazy-loads the MODEL_PATH version on first use)."""
+    from .model_registry import get_registry
+    return get_registry().get()
 
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-    
-    # Standard cleaning aligned with V3 training script
-    text = text.lower()
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    text = re.sub(r'<.*?>', '', text)
-    text = re.sub(r'[^a-zA-Z\s]', ' ', text)
-    tokens = text.split()
+def _model_input(text_lower):
+    # Same steps as the V3 training script: strip URLs and HTML, keep letter runs,
+    # drop stopwords/1-char tokens and lemmatize. The substring checks only skip
+    # regex passes that could not match.
+    if 'http' in text_lower or 'www.' in text_lower:
+        text_lower = _URL_PATTERN.sub('', text_lower)
+    if '<' in text_lower:
+        text_lower = _HTML_PATTERN.sub('', text_lower)
+    tokens = _ALPHA_TOKEN_PATTERN.findall(text_lower)
     
     # Use initialized NLTK components
     if stop_words and lemmatizer:
-        tokens = [lemmatizer.lemmatize(t) for t in tokens if t not in stop_words and len(t) > 1]
+        tokens = [lemmatize_token(t) for t in tokens if t not in stop_words and len(t) > 1]
     
-    text = ' '.join(tokens)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return ' '.join(tokens)
+
+def word_tokens(text_lower):
+    """Lemmatized tokens used by the word-scoring pass (words of 3+ characters)."""
+    return [lemmatize_token(t) for t in _WORD_TOKEN_PATTERN.findall(text_lower) if len(t) > 2]
+
+def clean_text(text):
+    if not isinstance(text, str):
+        return ""
+    return _model_input(text.lower())
+
+def preprocess_text(text):
+    """
+    Single preprocessing stage for one request: lowercases once and derives both
+    the model input (identical to clean_text) and the word-scoring tokens,
+    sharing one memoized lemmatizer between them.
+    """
+    text_lower = str(text).lower()
+    model_input = _model_input(text_lower) if isinstance(text, str) else ""
+    return PreprocessedText(text_lower, model_input, word_tokens(text_lower))
 
 def check_risk_phrases(text):
-    text_lower = text.lower()
-    # Expanded V3 Risks
-    RISK_PATTERNS = [
-        r"kill myself", r"suicide", r"end my life", r"end it all", r"self harm",
-        r"want to die", r"commit suicide", r"hurt myself", r"taking my life",
-        r"no reason to live", r"carbon monoxide", r"overdose", r"cut my wrist",
-        r"goodbye world", r"last note"
-    ]
-    detected = []
-    for phrase in RISK_PATTERNS:
-        if re.search(phrase, text_lower):
-            detected.append(phrase)
-    return detected
+    # Expanded V3 Risks (lexicon_matcher.RISK_PHRASES), matched in one automaton pass
+    return scan_text(text.lower())["risk"]
 
 def calculate_severity_score(confidence, label_idx, detected_risks):
     """
@@ -196,14 +296,11 @@ def analyze_anxiety(text: str, history: list = None):
     words = text_lower.split()
     is_short = len(words) < 3
     
-    # Emotional tone and anxiety signals
-    anxiety_signals = ['fear', 'nervous', 'anxious', 'scared', 'judged', 'judge', 'watching', 'uncomfortable', 'crowds', 'crowded', 'panic', 'heart', 'racing', 'shaking', 'social', 'presentation', 'public', 'weird', 'awkward', 'embarrassed', 'sweat', 'overwhelmed']
-    positive_signals = ['happy', 'good', 'well', 'relaxed', 'calm', 'fine', 'ok']
-    negative_signals = ['sad', 'bad', 'depressed', 'hurt', 'pain', 'stress', 'worried']
-    
-    has_anxiety = any(re.search(r'\b' + re.escape(s) + r'\b', text_lower) for s in anxiety_signals)
-    has_pos = any(re.search(r'\b' + re.escape(s) + r'\b', text_lower) for s in positive_signals)
-    has_neg = any(re.search(r'\b' + re.escape(s) + r'\b', text_lower) for s in negative_signals)
+    # Emotional tone and anxiety signals (lexicon_matcher signal lists, one scan)
+    signal_hits = scan_text(text_lower)
+    has_anxiety = bool(signal_hits["anxiety_signal"])
+    has_pos = bool(signal_hits["positive_signal"])
+    has_neg = bool(signal_hits["negative_signal"])
     
     # STEP 3 & 4: Detection & Classification
     detected_risks = check_risk_phrases(text)
@@ -215,6 +312,7 @@ def analyze_anxiety(text: str, history: list = None):
     else:
         probs = model.predict_proba([cleaned])[0]
     
+    import numpy as np
     pred_idx = np.argmax(probs)
     conf = float(np.max(probs))
     
@@ -225,7 +323,7 @@ def analyze_anxiety(text: str, history: list = None):
     follow_up = None
 
     # Overrides based on new rules
-    direct_trigger = any(re.search(r'\b' + re.escape(s) + r'\b', text_lower) for s in ['judged', 'judge', 'watching', 'panic', 'heart', 'racing', 'shaking', 'crowded', 'sweat', 'awkward', 'embarrassed'])
+    direct_trigger = bool(signal_hits["direct_trigger"])
     if direct_trigger:
         prediction = "High Anxiety"
         conf = max(conf, 0.90)
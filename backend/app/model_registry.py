@@ -0,0 +1,304 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from . import metrics, ml_utils
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ml_models")
+# nlp_anxiety_model_<version>.pkl, its flat export (.flat/) and optional metadata sidecar (.meta.json)
+ARTIFACT_PATTERN = re.compile(r"^nlp_anxiety_model_(v\d+)\.(pkl|flat)$")
+# Version served when a request doesn't pin one; defaults to the version in MODEL_PATH
+MODEL_VERSION = os.environ.get("MODEL_VERSION", "")
+# Models kept in memory besides the active one (for pinned requests); least recently used are dropped
+MODEL_REGISTRY_MAX_LOADED = int(os.environ.get("MODEL_REGISTRY_MAX_LOADED", "2"))
+
+_registry = None
+_registry_lock = threading.Lock()
+
+class UnknownModelVersion(LookupError):
+    pass
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _default_version():
+    if MODEL_VERSION:
+        return MODEL_VERSION
+    match = ARTIFACT_PATTERN.match(os.path.basename(ml_utils.MODEL_PATH))
+    return match.group(1) if match else None
+
+class ModelHandle:
+    """
+    A loaded model version. Quacks like the pipeline (predict_proba), so it can
+    be passed anywhere a model is expected; `key` changes whenever the artifact
+    content does, which is what the prediction cache keys on.
+    """
+    __slots__ = ("version", "checksum", "key", "format", "model", "loaded_at", "_vectorize", "_classify")
+
+    def __init__(self, version, checksum, fmt, model):
+        self.version = version
+        self.checksum = checksum
+        self.key = f"{version}@{checksum[:12]}"
+        self.format = fmt
+        self.model = model
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        # Split feature extraction from the ensemble so each is timed separately
+        if hasattr(model, "classify"):
+            self._vectorize, self._classify = model.transform, model.classify
+        elif hasattr(model, "steps"):
+            self._vectorize, self._classify = model[:-1].transform, model[-1].predict_proba
+        else:
+            self._vectorize = self._classify = None
+
+    def predict_proba(self, texts):
+        if self._vectorize is None:
+            with metrics.stage("ensemble"):
+                return self.model.predict_proba(texts)
+        with metrics.stage("vectorize"):
+            X = self._vectorize(texts)
+        with metrics.stage("ensemble"):
+            return self._classify(X)
+
+class ModelRegistry:
+    """
+    Versioned model artifacts in MODEL_DIR. The active version is swapped with
+    a single reference assignment after the new model has loaded and warmed up,
+    so in-flight requests finish on the model they started with.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, default_version=None):
+        self.model_dir = model_dir
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._catalog = {}
+        self._checksums = {}  # path -> ((mtime_ns, size), sha256)
+        self._loaded = OrderedDict()  # version -> ModelHandle, least recently used first
+        self.active_version = default_version or _default_version()
+        self._active = None
+        self._activation = None
+        self.swaps = 0
+
+    def _checksum(self, path, fmt):
+        target = os.path.join(path, "manifest.json") if fmt == "flat" else path
+        st = os.stat(target)
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = self._checksums.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        if fmt == "flat":
+            with open(target, 'r', encoding='utf-8') as f:
+                checksum = json.load(f).get("source_sha256") or _file_sha256(target)
+        else:
+            checksum = _file_sha256(path)
+        self._checksums[path] = (signature, checksum)
+        return checksum
+
+    def discover(self):
+        """Rescan MODEL_DIR. Returns {version: metadata}."""
+        found = {}
+        try:
+            names = sorted(os.listdir(self.model_dir))
+        except OSError:
+            names = []
+        for name in names:
+            match = ARTIFACT_PATTERN.match(name)
+            if match:
+                found.setdefault(match.group(1), {})[match.group(2)] = os.path.join(self.model_dir, name)
+
+        catalog = {}
+        for version, paths in found.items():
+            # The flat export is preferred when MODEL_FORMAT=flat, the pickle otherwise
+            if ml_utils.MODEL_FORMAT == "flat" and "flat" in paths:
+                fmt = "flat"
+            else:
+                fmt = "pkl" if "pkl" in paths else "flat"
+            path = paths[fmt]
+            try:
+                checksum = self._checksum(path, fmt)
+            except OSError as e:
+                print(f"Error reading model artifact {path}: {e}")
+                continue
+            stem = os.path.join(self.model_dir, f"nlp_anxiety_model_{version}")
+            metadata = {}
+            if os.path.exists(stem + ".meta.json"):
+                try:
+                    with open(stem + ".meta.json", 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
+                except Exception as e:
+                    print(f"Error reading model metadata for {version}: {e}")
+            catalog[version] = {
+                "version": version,
+                "path": path,
+                "format": fmt,
+                "checksum": checksum,
+                "trained_at": metadata.get("trained_at")
+                              or datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).isoformat(),
+                "metrics": metadata.get("metrics"),
+            }
+        self._catalog = catalog
+        return catalog
+
+    def has_version(self, version):
+        return version in self._catalog or version in self.discover()
+
+    def _load(self, version):
+        info = self._catalog.get(version) or self.discover().get(version)
+        if info is None:
+            raise UnknownModelVersion(version)
+        ml_utils.initialize_nltk()
+        print(f"Loading model {version} from {info['path']}...")
+        started = time.perf_counter()
+        if info["format"] == "flat":
+            from .flat_model import load_flat_model
+            model = load_flat_model(info["path"], fast=ml_utils.FAST_INFERENCE)
+        else:
+            with open(info["path"], 'rb') as f:
+                model = pickle.load(f)
+        metrics.MODEL_LOAD_SECONDS.set(time.perf_counter() - started, version=version, format=info["format"])
+        print(f"Model {version} loaded successfully.")
+        return ModelHandle(version, info["checksum"], info["format"], model)
+
+    def _is_current(self, handle):
+        """False once discover() has seen a different artifact under the handle's version."""
+        info = self._catalog.get(handle.version)
+        return info is None or info["checksum"] == handle.checksum
+
+    def _get_loaded(self, version):
+        """
+        Loaded handle for version, loading it at most once even under concurrent
+        callers. A handle whose artifact was replaced on disk is loaded again.
+        """
+        with self._lock:
+            handle = self._loaded.get(version)
+            if handle is not None and self._is_current(handle):
+                self._loaded.move_to_end(version)
+                return handle
+            load_lock = self._load_locks.setdefault(version, threading.Lock())
+        with load_lock:
+            with self._lock:
+                handle = self._loaded.get(version)
+            if handle is None or not self._is_current(handle):
+                handle = self._load(version)
+            with self._lock:
+                self._loaded[version] = handle
+                self._loaded.move_to_end(version)
+                self._evict()
+            return handle
+
+    def follow(self, version):
+        """
+        Inference workers: adopt the API process's active version, so eviction
+        keeps that model and drops the one the worker started with. The
+        version itself is loaded on first use.
+        """
+        if version == self.active_version:
+            return
+        with self._lock:
+            self.active_version = version
+            self._active = self._loaded.get(version)
+            self._evict()
+
+    def _evict(self):
+        spare = [v for v in self._loaded if v != self.active_version]
+        while len(spare) > MODEL_REGISTRY_MAX_LOADED:
+            del self._loaded[spare.pop(0)]
+
+    def get(self, version=None):
+        """
+        Model handle for a pinned version, or the active one when version is None.
+        Returns None when the active artifact is missing; raises UnknownModelVersion
+        for a pinned version that doesn't exist.
+        """
+        if version is None or version == self.active_version:
+            active = self._active
+            if active is not None and self._is_current(active):
+                return active
+            try:
+                self._active = self._get_loaded(self.active_version)
+            except UnknownModelVersion:
+                print(f"Warning: Model {self.active_version} not found in {self.model_dir}")
+                return None
+            return self._active
+        return self._get_loaded(version)
+
+    def activate(self, version, warm=None):
+        """
+        Load and warm `version` on a background thread, then make it the active
+        model. `warm(version)` runs the warm-up; by default one scoring pass in-process.
+        """
+        if version not in self.discover():
+            raise UnknownModelVersion(version)
+        with self._lock:
+            if self._activation and self._activation["state"] == "loading":
+                return dict(self._activation)
+            self._activation = {
+                "version": version,
+                "state": "loading",
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "error": None,
+            }
+        threading.Thread(target=self._activate, args=(version, warm), name="model-activate", daemon=True).start()
+        return dict(self._activation)
+
+    def _activate(self, version, warm):
+        try:
+            if warm is None:
+                from .scoring import score_texts
+                from .startup import WARMUP_TEXTS, warmup_scope
+                with warmup_scope():
+                    score_texts(WARMUP_TEXTS, self._get_loaded(version))
+            else:
+                # Raises when the version fails to load or warm up in an inference worker
+                warm(version)
+            # Loaded here as well, so the first request after the swap doesn't load it on the request path
+            handle = self._get_loaded(version)
+            with self._lock:
+                # The swap: one assignment each, readers see either the old or the new model
+                previous = self.active_version
+                self._active = handle
+                self.active_version = version
+                self.swaps += 1
+                self._evict()
+                self._activation.update(state="active", finished_at=datetime.now(timezone.utc).isoformat())
+            print(f"Active model switched from {previous} to {version}")
+        except Exception as e:
+            print(f"Error activating model {version}: {e}")
+            with self._lock:
+                self._activation.update(state="failed", error=str(e))
+
+    def status(self):
+        catalog = self.discover()
+        with self._lock:
+            loaded = {v: {"key": h.key, "format": h.format, "loaded_at": h.loaded_at} for v, h in self._loaded.items()}
+            activation = dict(self._activation) if self._activation else None
+        return {
+            "active_version": self.active_version,
+            "swaps": self.swaps,
+            "activation": activation,
+            "loaded": loaded,
+            "versions": [
+                {**{k: v for k, v in info.items() if k != "path"},
+                 "artifact": os.path.basename(info["path"]),
+                 "active": version == self.active_version}
+                for version, info in sorted(catalog.items())
+            ],
+        }
+
+def get_registry():
+    """Lazy-create the process-wide registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
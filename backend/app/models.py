@@ -1,6 +1,10 @@
-from pydantic import BaseModel
+import os
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
+# Most texts one /predict/batch call may carry; larger requests get 422
+BATCH_MAX_TEXTS = int(os.environ.get("BATCH_MAX_TEXTS", "1000"))
+
 class DetectedWord(BaseModel):
     word: str
     label: str
@@ -8,6 +12,12 @@ class DetectedWord(BaseModel):
 
 class PredictRequest(BaseModel):
     text: str
+    # Pin a registry model version (e.g. "v4"); the active version is used when omitted
+    model_version: Optional[str] = None
+
+class BatchPredictRequest(BaseModel):
+    texts: List[str] = Field(..., max_length=BATCH_MAX_TEXTS)
+    model_version: Optional[str] = None
 
 class PredictResponse(BaseModel):
     prediction: str
@@ -18,6 +28,7 @@ class PredictResponse(BaseModel):
     suggestion: Optional[str] = None
     follow_up: Optional[List[str]] = None
     suggestions: Optional[List[str]] = None
+    model_version: Optional[str] = None
 
 class HistoryItem(BaseModel):
     id: int
@@ -26,3 +37,4 @@ class HistoryItem(BaseModel):
     confidence: float
     detected_words: List[DetectedWord]
     timestamp: str
+    model_version: Optional[str] = None
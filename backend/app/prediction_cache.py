@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .startup import in_warmup
+
+# Cache of predict_proba rows keyed on the cleaned model input; 0 disables it
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+# Seconds before an entry expires; 0 keeps entries until they are evicted
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "0"))
+# Long inputs rarely repeat, so they are not worth a cache slot
+PREDICTION_CACHE_MAX_KEY = int(os.environ.get("PREDICTION_CACHE_MAX_KEY", "512"))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def _model_key(model):
+    # Registry handles carry "<version>@<checksum>"; anything else is keyed by identity
+    return getattr(model, "key", None) or id(model)
+
+class ProbabilityCache:
+    """
+    Bounded LRU cache of model probabilities with an optional TTL.
+    Entries are keyed on (model version and checksum, cleaned text), so pinned
+    versions share the cache and a swapped artifact can never answer for a new one.
+    """
+
+    def __init__(self, max_entries=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (model key, cleaned text) -> (probs, stored_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_many(self, model, texts):
+        """Returns a list aligned with texts holding cached rows or None for misses."""
+        if in_warmup():
+            # Warm-up must exercise the model, and its lookups aren't real hits or misses
+            return [None] * len(texts)
+        now = time.monotonic()
+        model_key = _model_key(model)
+        found = []
+        with self._lock:
+            for text in texts:
+                key = (model_key, text)
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl and now - entry[1] > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    found.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found.append(entry[0])
+        return found
+
+    def put_many(self, model, texts, rows):
+        if in_warmup():
+            return
+        now = time.monotonic()
+        model_key = _model_key(model)
+        with self._lock:
+            for text, row in zip(texts, rows):
+                if len(text) > PREDICTION_CACHE_MAX_KEY:
+                    continue
+                row = row.copy()
+                row.flags.writeable = False
+                key = (model_key, text)
+                self._entries[key] = (row, now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+def get_prediction_cache():
+    """Lazy-create the shared cache; None when PREDICTION_CACHE_SIZE is 0."""
+    global _cache
+    if PREDICTION_CACHE_SIZE <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ProbabilityCache()
+    return _cache
@@ -1,103 +1,56 @@
-import os
-import re
-import csv
 from datetime import datetime, timezone
 
-try:
-    import nltk
-    from nltk.stem import WordNetLemmatizer
-except ImportError:
-    pass
-
-WORD_DICTIONARY = None
 lemmatizer = None
 
-# Import suggestions pool from ml_utils
-from .ml_utils import get_v3_suggestions
+# Import suggestions pool and the shared text preprocessing from ml_utils
+from .ml_utils import get_v3_suggestions, get_lemmatizer, word_tokens
+from .lexicon_matcher import scan_text
+from .metrics import PREDICTIONS
+from .startup import in_warmup
+from .word_lexicon import get_lexicon_index
 
 def load_word_dictionary():
-    global WORD_DICTIONARY
-    if WORD_DICTIONARY is not None:
-        return WORD_DICTIONARY
-        
-    WORD_DICTIONARY = {}
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    
-    files = {
-        "High": os.path.join(base_dir, "high_anxiety_words.csv"),
-        "Moderate": os.path.join(base_dir, "moderate_anxiety_words.csv"),
-        "Low": os.path.join(base_dir, "low_anxiety_words.csv")
-    }
-    
-    for label, filepath in files.items():
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    word = row['word'].strip().lower()
-                    weight = int(row['weight'])
-                    
-                    if word not in WORD_DICTIONARY:
-                         WORD_DICTIONARY[word] = (label, weight)
-                    else:
-                         existing_label, existing_weight = WORD_DICTIONARY[word]
-                         if weight > existing_weight:
-                             WORD_DICTIONARY[word] = (label, weight)
-                         elif weight == existing_weight:
-                             priority = {"High": 3, "Moderate": 2, "Low": 1}
-                             if priority[label] > priority[existing_label]:
-                                 WORD_DICTIONARY[word] = (label, weight)
-                                 
-    return WORD_DICTIONARY
+    """{word: (label, weight)} from the current (hot-reloaded) lexicon index."""
+    return get_lexicon_index().words
 
 def init_nlp():
     global lemmatizer
     if lemmatizer is None:
-        try:
-            nltk.data.find('corpora/wordnet')
-        except LookupError:
-            nltk.download('wordnet', quiet=True)
-        lemmatizer = WordNetLemmatizer()
+        # Same instance ml_utils uses, so both passes share one lemma cache
+        lemmatizer = get_lemmatizer()
     return lemmatizer
 
-def predict_with_words(text: str, ml_prediction: str, ml_confidence: float) -> dict:
-    word_dict = load_word_dictionary()
-    lemma = init_nlp()
+def predict_with_words(text: str, ml_prediction: str, ml_confidence: float, tokens: list = None) -> dict:
+    """
+    Combines the ML prediction with the word lexicon and keyword overrides.
+    `tokens` can carry the lemmatized tokens already produced by
+    ml_utils.preprocess_text so the text isn't tokenized twice.
+    """
+    # Pin one index for the whole request; a reload swaps in a new object
+    lexicon = get_lexicon_index().scoring
     
     # Preprocess input
     text_lower = str(text).lower()
-    text_clean = re.sub(r'[^\w\s\']', ' ', text_lower)
-    tokens = text_clean.split()
-    lemmatized_tokens = [lemma.lemmatize(t) for t in tokens if len(t) > 2]
+    lemmatized_tokens = tokens if tokens is not None else word_tokens(text_lower)
+    
+    keyword_hits = scan_text(text_lower)
     
     # Negative Distress Detection (STEP 0)
-    distress_keywords = ['crying', "can't stop", 'breakdown', 'pain', 'hurt']
-    has_distress = any(dk in text_lower for dk in distress_keywords)
+    has_distress = bool(keyword_hits["distress"])
     
     # Sentiment Override (STEP 2)
-    positive_keywords = ['happy', 'calm', 'relaxed', 'confident', 'peaceful']
-    has_positive = any(pk in text_lower for pk in positive_keywords)
+    has_positive = bool(keyword_hits["positive_keyword"])
     
     scores = {"High": 0, "Moderate": 0, "Low": 0}
-    raw_detected = []
+    detected_words = []
     
+    # The index only holds words with weight >= 2 (weak words are ignored completely)
+    # and carries each word's precomputed impact.
     for word in lemmatized_tokens:
-        if word in word_dict:
-            label, weight = word_dict[word]
-            raw_detected.append({"word": word, "label": label, "weight": weight})
-
-    detected_words = []
-    for dw in raw_detected:
-        w = dw['weight']
-        lbl = dw['label']
-        
-        # Rule: Only consider words with weight >= 2. Ignore weak words completely.
-        if w < 2:
-            continue
-            
-        impact = w * 2 if w >= 3 else w
-        scores[lbl] += impact
-        detected_words.append(dw)
+        entry = lexicon.get(word)
+        if entry is not None:
+            scores[entry.label] += entry.impact
+            detected_words.append({"word": word, "label": entry.label, "weight": entry.weight})
             
     high = scores["High"]
     mod = scores["Moderate"]
@@ -122,11 +75,13 @@ def predict_with_words(text: str, ml_prediction: str, ml_confidence: float) -> d
         final_pred = "High Anxiety"
         final_conf = 0.95
         reason = "Distress signals detected (crying, pain, break down, etc)."
+        path = "distress"
     # 2. SECOND PRIORITY: ML Model (User requested Combined Data.csv first)
     elif ml_confidence > 0.45:
         final_pred = ml_label
         final_conf = ml_confidence
         reason = f"Validated by ML Ensemble ({ml_prediction} with {ml_confidence*100:.1f}% confidence)."
+        path = "ml_validated"
         
         # Check if keywords strongly disagree with a "Low" prediction
         if ml_label == "Low Anxiety" and scores["High"] >= 5:
@@ -137,8 +92,10 @@ def predict_with_words(text: str, ml_prediction: str, ml_confidence: float) -> d
         final_pred = "Low Anxiety"
         final_conf = 0.90
         reason = "Clear positive sentiment detected."
+        path = "sentiment"
     # 4. FOURTH PRIORITY: Keyword Scoring Pass (Fallback)
     elif len(detected_words) > 0:
+        path = "keyword"
         strong_high_count = sum(1 for dw in detected_words if dw['label'] == 'High' and dw['weight'] >= 3)
         raw_high_score = sum(dw['weight'] for dw in detected_words if dw['label'] == 'High')
         
@@ -163,8 +120,11 @@ def predict_with_words(text: str, ml_prediction: str, ml_confidence: float) -> d
         final_pred = "Uncertain"
         final_conf = ml_confidence
         reason = "Insufficient emotional signals found."
+        path = "uncertain"
 
     timestamp = datetime.now(timezone.utc).isoformat()
+    if not in_warmup():
+        PREDICTIONS.inc(prediction=final_pred, path=path)
 
     if final_pred == "Uncertain":
         return {
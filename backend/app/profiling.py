@@ -0,0 +1,203 @@
+import cProfile
+import heapq
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+# Debug mode: `X-Profile: 1` or `?profile=1` makes /predict return a per-stage `timings` block.
+# When off, /predict does no profiling work at all.
+PROFILING = os.environ.get("PROFILING", "0") == "1"
+# Fraction of ordinary /predict calls also run through the profiled path (response unchanged),
+# so slow outliers are caught without anyone setting the flag
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+# Where cProfile dumps of the slowest profiled requests go; empty disables cProfile
+PROFILE_DUMP_DIR = os.environ.get("PROFILE_DUMP_DIR", "")
+# Dumps kept per interval: the slowest PROFILE_TOP_N requests of every PROFILE_INTERVAL seconds
+PROFILE_TOP_N = int(os.environ.get("PROFILE_TOP_N", "5"))
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "300"))
+
+_dumps = None
+_dumps_lock = threading.Lock()
+# cProfile is one per interpreter on Python 3.12+ ("Another profiling tool is already active"),
+# so concurrent profiled requests take turns; a request that finds it busy runs without a dump
+_profiler_lock = threading.Lock()
+
+def profile_mode(http_request):
+    """'timings' when the caller asked for the breakdown, 'sampled' when picked at random, else None."""
+    flag = http_request.headers.get("x-profile") or http_request.query_params.get("profile")
+    if flag and flag.lower() in ("1", "true", "yes"):
+        return "timings"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+class SlowestProfiles:
+    """
+    cProfile dumps of the slowest N profiled requests per interval. A request
+    slower than the current Nth replaces it and the evicted dump is deleted;
+    dumps from earlier intervals are left on disk.
+    """
+
+    def __init__(self, directory=PROFILE_DUMP_DIR, top_n=PROFILE_TOP_N, interval=PROFILE_INTERVAL):
+        self.directory = directory
+        self.top_n = top_n
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._heap = []  # (seconds, path), fastest kept dump first
+        os.makedirs(directory, exist_ok=True)
+
+    def offer(self, seconds, profiler):
+        """Write the profile if it is among the slowest of this interval. Returns its path or None."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.interval:
+                self._window_start = now
+                self._heap = []
+            if len(self._heap) >= self.top_n and seconds <= self._heap[0][0]:
+                return None
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+            path = os.path.join(self.directory, f"predict-{stamp}-{seconds * 1000:.1f}ms.prof")
+            profiler.dump_stats(path)
+            heapq.heappush(self._heap, (seconds, path))
+            if len(self._heap) > self.top_n:
+                _, evicted = heapq.heappop(self._heap)
+                try:
+                    os.remove(evicted)
+                except OSError as e:
+                    print(f"Error removing profile dump {evicted}: {e}")
+            return path
+
+def get_profile_dumps():
+    """Lazy-create the dump keeper; None unless PROFILE_DUMP_DIR is set."""
+    global _dumps
+    if not PROFILE_DUMP_DIR:
+        return None
+    if _dumps is None:
+        with _dumps_lock:
+            if _dumps is None:
+                _dumps = SlowestProfiles()
+    return _dumps
+
+def _model_stages(model):
+    """
+    ([(name, transform)], [(name, predict_proba)], weights) for a pickled
+    pipeline or flat model, so each feature block and ensemble member can be
+    timed. Falls back to a single stage for anything else.
+    """
+    from sklearn.ensemble import VotingClassifier
+    from sklearn.pipeline import FeatureUnion, Pipeline
+
+    if hasattr(model, "classify"):
+        transforms = [(t.name, t.transform) for t in model.transformers]
+        if model.fused is not None:
+            return transforms, [("fused", model.fused.classify)], None
+        return transforms, [(m.name, m.predict_proba) for m in model.members], model.weights
+
+    if isinstance(model, Pipeline) and len(model.steps) == 2:
+        (features_name, features), clf = model.steps[0], model.steps[1][1]
+        if isinstance(features, FeatureUnion) and not features.transformer_weights:
+            transforms = [(name, t.transform) for name, t in features.transformer_list if t not in ("drop", "passthrough")]
+        else:
+            transforms = [(features_name, features.transform)]
+        if isinstance(clf, VotingClassifier) and clf.voting == "soft":
+            kept = [(name, w) for (name, est), w in zip(clf.estimators, clf.weights if clf.weights is not None else [None] * len(clf.estimators))
+                    if est != "drop"]
+            weights = [w for _, w in kept] if clf.weights is not None else None
+            return transforms, [(name, est.predict_proba) for (name, _), est in zip(kept, clf.estimators_)], weights
+        return transforms, [("clf", clf.predict_proba)], None
+
+    return [], [("model", model.predict_proba)], None
+
+def _us(started):
+    return round((time.perf_counter() - started) * 1e6, 1)
+
+def score_with_timings(text, handle):
+    """
+    Score one text like scoring.score_texts, step by step, timing each feature
+    transformer and ensemble member. Skips the prediction cache and micro-batcher.
+    """
+    import numpy as np
+    import scipy.sparse as sp
+
+    from .ml_utils import preprocess_text
+    from .prediction_system import predict_with_words
+    from .scoring import FAILSAFE_PROBS, LABEL_MAP
+
+    timings = {}
+    started = time.perf_counter()
+    pre = preprocess_text(text)
+    timings["clean_text_us"] = _us(started)
+
+    transforms, members, weights = _model_stages(handle.model)
+    timings["transform_us"] = {}
+    timings["ensemble_us"] = {}
+    if not pre.model_input:
+        row = np.asarray(FAILSAFE_PROBS)
+    elif not transforms:
+        started = time.perf_counter()
+        row = np.asarray(members[0][1]([pre.model_input]))[0]
+        timings["ensemble_us"][members[0][0]] = _us(started)
+    else:
+        blocks = []
+        for name, transform in transforms:
+            started = time.perf_counter()
+            blocks.append(transform([pre.model_input]))
+            timings["transform_us"][name] = _us(started)
+        X = blocks[0] if len(blocks) == 1 else sp.hstack(blocks).tocsr()
+        probas = []
+        for name, predict_proba in members:
+            started = time.perf_counter()
+            probas.append(np.asarray(predict_proba(X)))
+            timings["ensemble_us"][name] = _us(started)
+        started = time.perf_counter()
+        row = np.average(np.asarray(probas), axis=0, weights=weights)[0]
+        timings["combine_us"] = _us(started)
+
+    started = time.perf_counter()
+    result = predict_with_words(text, LABEL_MAP[int(row.argmax())], float(row.max()), tokens=pre.word_tokens)
+    result["model_version"] = handle.version
+    timings["predict_with_words_us"] = _us(started)
+    return result, timings
+
+def profile_predict(text, model_version=None):
+    """
+    The whole profiled /predict (scoring and persistence) on the calling thread,
+    under cProfile when PROFILE_DUMP_DIR is set and no other request holds the
+    profiler (profile_dump is null otherwise). Returns (result, timings), or
+    (None, None) when the model is unavailable.
+    """
+    from .model_registry import get_registry
+    from .scoring import to_db_row
+    from .write_behind import persist_predictions
+
+    handle = get_registry().get(model_version)
+    if not handle:
+        return None, None
+
+    dumps = get_profile_dumps()
+    profiler = None
+    if dumps is not None and _profiler_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result, timings = score_with_timings(text, handle)
+            persist_started = time.perf_counter()
+            persist_predictions([to_db_row(text, result)])
+            timings["persist_us"] = _us(persist_started)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    finally:
+        if profiler is not None:
+            _profiler_lock.release()
+    elapsed = time.perf_counter() - started
+    timings["total_us"] = round(elapsed * 1e6, 1)
+    timings["model_version"] = handle.version
+    timings["profile_dump"] = dumps.offer(elapsed, profiler) if profiler is not None else None
+    return result, timings
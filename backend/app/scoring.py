@@ -0,0 +1,98 @@
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from . import metrics
+from .batcher import get_batcher
+from .ml_utils import preprocess_text
+from .prediction_cache import get_prediction_cache
+from .prediction_system import predict_with_words
+from .startup import in_warmup
+
+# `samples` carries metric updates buffered in an inference worker (see metrics.recording)
+ScoredBatch = namedtuple("ScoredBatch", ["results", "model_inputs", "probs", "model_seconds", "samples"], defaults=[None])
+
+LABEL_MAP = {0: "Low Anxiety", 1: "Moderate Anxiety", 2: "High Anxiety"}
+FAILSAFE_PROBS = [1.0, 0.0, 0.0]
+
+def _run_model(model, texts):
+    import numpy as np
+
+    # Warm-up calls the model directly: the batcher thread doesn't see the warm-up scope
+    batcher = None if in_warmup() else get_batcher()
+    if batcher is not None and len(texts) < batcher.max_batch_size:
+        return batcher.predict_proba(model, texts)
+    return np.asarray(model.predict_proba(texts))
+
+def predict_probabilities(model, cleaned_texts):
+    """
+    Runs one predict_proba over every non-empty cleaned text.
+    Empty texts get the failsafe distribution without touching the model,
+    and texts already in the prediction cache skip it as well.
+    Small requests go through the micro-batcher when it is enabled so that
+    concurrent callers share one model call.
+    """
+    import numpy as np
+
+    probs = np.tile(FAILSAFE_PROBS, (len(cleaned_texts), 1))
+    rows = [i for i, cleaned in enumerate(cleaned_texts) if cleaned]
+    if not rows:
+        return probs
+    texts = [cleaned_texts[i] for i in rows]
+
+    cache = get_prediction_cache()
+    if cache is not None:
+        misses = []
+        for i, text, cached in zip(rows, texts, cache.get_many(model, texts)):
+            if cached is None:
+                misses.append((i, text))
+            else:
+                probs[i] = cached
+        rows = [i for i, _ in misses]
+        texts = [text for _, text in misses]
+
+    if rows:
+        fresh = _run_model(model, texts)
+        probs[rows] = fresh
+        if cache is not None:
+            cache.put_many(model, texts, fresh)
+    return probs
+
+def score_texts_detailed(texts, model):
+    """
+    Cleans, scores and word-checks a list of raw texts in one vectorized pass.
+    Also returns the cleaned model inputs, the probability rows and the seconds
+    spent getting them, for shadow comparisons.
+    """
+    import time
+
+    with metrics.stage("clean"):
+        preprocessed = [preprocess_text(text) for text in texts]
+    model_inputs = [pre.model_input for pre in preprocessed]
+    started = time.perf_counter()
+    probs = predict_probabilities(model, model_inputs)
+    model_seconds = time.perf_counter() - started
+
+    results = []
+    with metrics.stage("word_scoring"):
+        for text, pre, row in zip(texts, preprocessed, probs):
+            pred_idx = int(row.argmax())
+            ml_conf = float(row.max())
+            result = predict_with_words(text, LABEL_MAP[pred_idx], ml_conf, tokens=pre.word_tokens)
+            result["model_version"] = getattr(model, "version", None)
+            results.append(result)
+    return ScoredBatch(results, model_inputs, probs, model_seconds)
+
+def score_texts(texts, model):
+    """Cleans, scores and word-checks a list of raw texts in one vectorized pass."""
+    return score_texts_detailed(texts, model).results
+
+def to_db_row(text, final_output):
+    """Builds the predictions table row for a scored text."""
+    pred_val = final_output.get("prediction", "Uncertain")
+    conf_val = final_output.get("confidence", 0.0)
+    dw_val = json.dumps(final_output.get("detected_words", []))
+
+    # If the response doesn't have a generated timestamp due to Uncertain fallback, make one
+    ts_val = final_output.get("timestamp", datetime.utcnow().isoformat())
+    return (text, pred_val, conf_val, dw_val, ts_val, final_output.get("model_version"))
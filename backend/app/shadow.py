@@ -0,0 +1,199 @@
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+# Registry version scored in the shadow of every /predict call; empty disables shadow mode
+SHADOW_MODEL_VERSION = os.environ.get("SHADOW_MODEL_VERSION", "")
+# Fraction of scored batches also sent to the candidate
+SHADOW_SAMPLE_RATE = float(os.environ.get("SHADOW_SAMPLE_RATE", "1"))
+# Batches allowed in flight on the shadow executor; anything beyond is dropped, never queued
+SHADOW_MAX_PENDING = int(os.environ.get("SHADOW_MAX_PENDING", "16"))
+# Rows kept in the rolling comparison summary
+SHADOW_WINDOW = int(os.environ.get("SHADOW_WINDOW", "2000"))
+
+LABELS = ["Low Anxiety", "Moderate Anxiety", "High Anxiety"]
+
+_shadow = None
+_shadow_lock = threading.Lock()
+
+def _init_shadow_worker(version):
+    from . import batcher
+    from .model_registry import get_registry
+
+    batcher.MICRO_BATCHING = False
+    get_registry().get(version)
+
+def _shadow_score(version, texts):
+    """Runs in the shadow process: candidate probabilities and model-call seconds."""
+    import numpy as np
+    from .model_registry import get_registry
+
+    model = get_registry().get(version)
+    started = time.perf_counter()
+    probs = np.asarray(model.predict_proba(texts))
+    return probs, time.perf_counter() - started
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class ShadowScorer:
+    """
+    Scores the primary model's cleaned inputs with a candidate version on its own
+    single-process executor and keeps a rolling comparison. Submission never
+    blocks: when SHADOW_MAX_PENDING batches are in flight, new ones are dropped.
+    """
+
+    def __init__(self, version, max_pending=SHADOW_MAX_PENDING, window=SHADOW_WINDOW, sample_rate=SHADOW_SAMPLE_RATE):
+        self.version = version
+        self.max_pending = max_pending
+        self.sample_rate = sample_rate
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._lock = threading.Lock()
+        self._pending = 0
+        # Per row: (agree, max |delta|, primary label, shadow label)
+        self._rows = deque(maxlen=window)
+        # Per batch: (rows, primary seconds, shadow seconds)
+        self._batches = deque(maxlen=window)
+
+        self.submitted = 0
+        self.compared = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.errors = 0
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_shadow_worker,
+            initargs=(version,),
+        )
+
+    def submit(self, primary_version, model_inputs, primary_probs, primary_seconds):
+        """Queue a comparison for the non-empty inputs of one scored batch. Never blocks."""
+        rows = [i for i, text in enumerate(model_inputs) if text]
+        if not rows or primary_version == self.version:
+            return
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        with self._lock:
+            if not sampled:
+                self.sampled_out += len(rows)
+                return
+            if self._pending >= self.max_pending:
+                self.dropped += len(rows)
+                return
+            self._pending += 1
+            self.submitted += len(rows)
+
+        texts = [model_inputs[i] for i in rows]
+        primary = primary_probs[rows]
+        try:
+            future = self._executor.submit(_shadow_score, self.version, texts)
+        except Exception as e:
+            self._finish_with_error(e)
+            return
+        future.add_done_callback(lambda f: self._record(f, primary, primary_seconds))
+
+    def _finish_with_error(self, error):
+        with self._lock:
+            self._pending -= 1
+            self.errors += 1
+        print(f"Error in shadow scoring ({self.version}): {error}")
+
+    def _record(self, future, primary, primary_seconds):
+        try:
+            shadow, shadow_seconds = future.result()
+        except Exception as e:
+            self._finish_with_error(e)
+            return
+        agree = primary.argmax(axis=1) == shadow.argmax(axis=1)
+        deltas = abs(primary - shadow).max(axis=1)
+        with self._lock:
+            self._pending -= 1
+            self.compared += len(primary)
+            for a, d, p, s in zip(agree, deltas, primary.argmax(axis=1), shadow.argmax(axis=1)):
+                self._rows.append((bool(a), float(d), int(p), int(s)))
+            self._batches.append((len(primary), primary_seconds, shadow_seconds))
+
+    def summary(self):
+        with self._lock:
+            rows = list(self._rows)
+            batches = list(self._batches)
+            counters = {
+                "submitted_rows": self.submitted,
+                "compared_rows": self.compared,
+                "dropped_rows": self.dropped,
+                "sampled_out_rows": self.sampled_out,
+                "errors": self.errors,
+                "pending_batches": self._pending,
+            }
+
+        deltas = [d for _, d, _, _ in rows]
+        disagreements = {}
+        for agree, _, p, s in rows:
+            if not agree:
+                key = f"{LABELS[p]} -> {LABELS[s]}"
+                disagreements[key] = disagreements.get(key, 0) + 1
+
+        def latency(index):
+            per_row = [b[index] / b[0] * 1000 for b in batches if b[0]]
+            return {
+                "p50_ms_per_row": _percentile(per_row, 0.5),
+                "p95_ms_per_row": _percentile(per_row, 0.95),
+                "p50_ms_per_batch": _percentile([b[index] * 1000 for b in batches], 0.5),
+            }
+
+        return {
+            "shadow_version": self.version,
+            "started_at": self.started_at,
+            "sample_rate": self.sample_rate,
+            "max_pending_batches": self.max_pending,
+            **counters,
+            "window_rows": len(rows),
+            "agreement_rate": sum(a for a, _, _, _ in rows) / len(rows) if rows else None,
+            "prob_delta": {
+                "mean": sum(deltas) / len(deltas) if deltas else None,
+                "p95": _percentile(deltas, 0.95),
+                "max": max(deltas) if deltas else None,
+            },
+            "disagreements": disagreements,
+            "latency": {"primary": latency(1), "shadow": latency(2)},
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def get_shadow():
+    return _shadow
+
+def start_shadow(version):
+    """(Re)start shadow scoring against `version`; the rolling summary starts empty."""
+    global _shadow
+    with _shadow_lock:
+        if _shadow is not None:
+            _shadow.close()
+        _shadow = ShadowScorer(version)
+        print(f"Shadow scoring enabled with model {version}")
+        return _shadow
+
+def stop_shadow():
+    global _shadow
+    with _shadow_lock:
+        if _shadow is not None:
+            _shadow.close()
+            _shadow = None
+
+def submit_shadow(primary_version, model_inputs, primary_probs, primary_seconds):
+    shadow = _shadow
+    if shadow is not None:
+        try:
+            shadow.submit(primary_version, model_inputs, primary_probs, primary_seconds)
+        except Exception as e:
+            print(f"Error submitting shadow batch: {e}")
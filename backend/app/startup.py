@@ -0,0 +1,159 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# "background" binds the port right away and loads/warms up behind /readyz
+STARTUP_MODE = os.environ.get("STARTUP_MODE", "blocking")
+# Synthetic texts pushed through the /predict scoring path before reporting ready
+WARMUP_TEXTS = [
+    "I get nervous when people are watching me speak in public.",
+    "Had a calm and relaxed afternoon with friends, feeling good.",
+    "My heart is racing and I can't stop shaking before the presentation.",
+    "",
+]
+
+logger = logging.getLogger(__name__)
+
+# Set while scoring synthetic warm-up texts, which must not count as traffic
+_warming_up = contextvars.ContextVar("warming_up", default=False)
+
+@contextmanager
+def warmup_scope():
+    """Score without touching metrics or the prediction cache."""
+    token = _warming_up.set(True)
+    try:
+        yield
+    finally:
+        _warming_up.reset(token)
+
+def in_warmup():
+    return _warming_up.get()
+
+class StartupTracker:
+    """Wall-clock timings of each startup phase plus liveness/readiness state."""
+
+    def __init__(self):
+        self.mode = STARTUP_MODE
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases = []
+        self.ready = False
+        self.ready_after = None
+        self.serving_after = None
+        self.error = None
+
+    def elapsed(self):
+        return time.perf_counter() - self._origin
+
+    def record(self, name, seconds, ok=True):
+        with self._lock:
+            self.phases.append({"name": name, "seconds": round(seconds, 4), "ok": ok})
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(name, time.perf_counter() - started, ok=False)
+            raise
+        self.record(name, time.perf_counter() - started)
+
+    def mark_serving(self):
+        self.serving_after = round(self.elapsed(), 4)
+
+    def mark_ready(self):
+        self.ready_after = round(self.elapsed(), 4)
+        self.ready = True
+
+    def fail(self, error):
+        self.error = str(error)
+
+    def report(self):
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "ready": self.ready,
+            "error": self.error,
+            # Seconds since app.main started importing
+            "serving_after_seconds": self.serving_after,
+            "ready_after_seconds": self.ready_after,
+            "phases": phases,
+        }
+
+tracker = StartupTracker()
+
+async def warm_up():
+    """
+    Score WARMUP_TEXTS through the same path as /predict (cleaning, lemmatizing,
+    model call, word scoring, response model) without persisting anything,
+    so the first real request doesn't pay the lazy-load and first-call costs.
+    Nothing is counted in /metrics or left in the prediction cache.
+    """
+    from .inference_executor import score_texts_async
+    from .models import PredictResponse
+    from .scoring import to_db_row
+
+    with warmup_scope():
+        results = await score_texts_async(WARMUP_TEXTS)
+    if results is None:
+        raise RuntimeError("ML model not loaded")
+    for text, result in zip(WARMUP_TEXTS, results):
+        PredictResponse(**result)
+        to_db_row(text, result)
+
+async def run_startup():
+    """Initialize the database, NLTK, lexicons and model, then warm up. Never raises."""
+    from starlette.concurrency import run_in_threadpool
+
+    from .database import init_db
+    from .inference_executor import INFERENCE_WORKERS, start_inference_pool
+    from .lexicon_matcher import get_matcher
+    from .ml_utils import get_model, initialize_nltk, load_lemma_table
+    from .shadow import SHADOW_MODEL_VERSION, start_shadow
+    from .word_lexicon import get_lexicon_index
+
+    try:
+        with tracker.phase("init_db"):
+            await run_in_threadpool(init_db)
+
+        with tracker.phase("nltk"):
+            await run_in_threadpool(initialize_nltk)
+
+        with tracker.phase("lexicons"):
+            await run_in_threadpool(get_lexicon_index)
+            await run_in_threadpool(get_matcher)
+            await run_in_threadpool(load_lemma_table)
+
+        if INFERENCE_WORKERS > 0:
+            # Workers load their own copy of the model; the API process doesn't need one
+            logger.info(f"Starting {INFERENCE_WORKERS} inference worker process(es)...")
+            with tracker.phase("inference_pool"):
+                await run_in_threadpool(start_inference_pool)
+        else:
+            logger.info("Loading ML model...")
+            with tracker.phase("model"):
+                model = await run_in_threadpool(get_model)
+            if not model:
+                raise RuntimeError("ML model failed to load during startup")
+
+        with tracker.phase("warmup"):
+            await warm_up()
+
+        if SHADOW_MODEL_VERSION:
+            with tracker.phase("shadow"):
+                await run_in_threadpool(start_shadow, SHADOW_MODEL_VERSION)
+
+        tracker.mark_ready()
+        summary = ", ".join(f"{p['name']} {p['seconds']:.2f}s" for p in tracker.phases)
+        logger.info(f"Ready after {tracker.ready_after:.2f}s ({summary})")
+    except Exception as e:
+        tracker.fail(e)
+        logger.error(f"Error during startup: {e}", exc_info=True)
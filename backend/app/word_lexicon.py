@@ -0,0 +1,147 @@
+import csv
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+LEXICON_FILES = {
+    "High": os.path.join(BASE_DIR, "high_anxiety_words.csv"),
+    "Moderate": os.path.join(BASE_DIR, "moderate_anxiety_words.csv"),
+    "Low": os.path.join(BASE_DIR, "low_anxiety_words.csv")
+}
+# Seconds between checks of the CSV files for edits; 0 disables hot reload
+LEXICON_CHECK_INTERVAL = float(os.environ.get("LEXICON_CHECK_INTERVAL", "2"))
+
+LABEL_PRIORITY = {"High": 3, "Moderate": 2, "Low": 1}
+# Words below this weight are ignored by the scorer
+MIN_SCORING_WEIGHT = 2
+
+LexiconEntry = namedtuple("LexiconEntry", ["label", "weight", "impact"])
+
+_index = None
+_checked_at = 0.0
+_reload_lock = threading.Lock()
+
+def _file_signature(files):
+    signature = []
+    for label, path in files.items():
+        try:
+            st = os.stat(path)
+            signature.append((label, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((label, None, None))
+    return tuple(signature)
+
+def read_word_dictionary(files=LEXICON_FILES):
+    """
+    Merge the label CSVs into {word: (label, weight)}.
+    A word listed under several labels keeps the highest weight, then the higher-priority label.
+    Also returns a checksum of the file contents.
+    """
+    words = {}
+    digest = hashlib.sha256()
+    for label, filepath in files.items():
+        if not os.path.exists(filepath):
+            continue
+        with open(filepath, 'rb') as f:
+            digest.update(label.encode() + b'\0' + f.read())
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                word = row['word'].strip().lower()
+                weight = int(row['weight'])
+
+                if word not in words:
+                    words[word] = (label, weight)
+                else:
+                    existing_label, existing_weight = words[word]
+                    if weight > existing_weight:
+                        words[word] = (label, weight)
+                    elif weight == existing_weight and LABEL_PRIORITY[label] > LABEL_PRIORITY[existing_label]:
+                        words[word] = (label, weight)
+    return words, digest.hexdigest()
+
+class LexiconIndex:
+    """
+    Immutable compiled lexicon. `scoring` only holds words the scorer uses
+    (weight >= MIN_SCORING_WEIGHT) with their precomputed impact: weight*2 for
+    weights of 3 and up, the weight itself below that.
+    """
+    __slots__ = ("words", "scoring", "version", "loaded_at", "signature")
+
+    def __init__(self, words, version, signature):
+        scoring = {}
+        for word, (label, weight) in words.items():
+            if weight < MIN_SCORING_WEIGHT:
+                continue
+            impact = weight * 2 if weight >= 3 else weight
+            scoring[word] = LexiconEntry(label, weight, impact)
+        self.words = MappingProxyType(dict(words))
+        self.scoring = MappingProxyType(scoring)
+        self.version = version
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.signature = signature
+
+    def stats(self):
+        per_label = {label: 0 for label in LABEL_PRIORITY}
+        for entry in self.scoring.values():
+            per_label[entry.label] += 1
+        return {
+            "version": self.version[:12],
+            "loaded_at": self.loaded_at,
+            "entries": len(self.words),
+            "scoring_entries": len(self.scoring),
+            "scoring_entries_by_label": per_label,
+        }
+
+def build_lexicon_index(files=None):
+    # Resolved at call time so the reload check and the rebuild always read the same files
+    files = files or LEXICON_FILES
+    signature = _file_signature(files)
+    words, version = read_word_dictionary(files)
+    return LexiconIndex(words, version, signature)
+
+def _maybe_reload():
+    global _index
+    # Only one thread rebuilds; everyone else keeps serving the current index
+    if not _reload_lock.acquire(blocking=False):
+        return
+    try:
+        signature = _file_signature(LEXICON_FILES)
+        if signature == _index.signature:
+            return
+        new_index = build_lexicon_index()
+        if new_index.version != _index.version:
+            print(f"Lexicon reloaded: version {new_index.version[:12]} ({len(new_index.words)} words)")
+            _index = new_index
+        else:
+            # Touched but unchanged: remember the new mtimes, keep the old index
+            new_index.loaded_at = _index.loaded_at
+            _index = new_index
+    except Exception as e:
+        print(f"Error reloading lexicon, keeping version {_index.version[:12]}: {e}")
+    finally:
+        _reload_lock.release()
+
+def get_lexicon_index():
+    """
+    Current lexicon index. The CSV files are re-checked at most every
+    LEXICON_CHECK_INTERVAL seconds, and a changed lexicon is swapped in with a
+    single reference assignment, so in-flight requests finish on the index they started with.
+    """
+    global _index, _checked_at
+    if _index is None:
+        with _reload_lock:
+            if _index is None:
+                _index = build_lexicon_index()
+                _checked_at = time.monotonic()
+        return _index
+    if LEXICON_CHECK_INTERVAL > 0:
+        now = time.monotonic()
+        if now - _checked_at >= LEXICON_CHECK_INTERVAL:
+            _checked_at = now
+            _maybe_reload()
+    return _index
@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+import time
+
+from . import metrics
+from .database import save_predictions
+
+# Write-behind is opt-in: /predict responds before its row is committed
+WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_QUEUE_SIZE = int(os.environ.get("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "500"))
+WRITE_BEHIND_FLUSH_MS = float(os.environ.get("WRITE_BEHIND_FLUSH_MS", "200"))
+# How long a producer waits for room in a full queue before writing synchronously
+WRITE_BEHIND_PUT_TIMEOUT = float(os.environ.get("WRITE_BEHIND_PUT_TIMEOUT", "5"))
+# Extra attempts for a batch whose write failed before its rows are dropped (and counted)
+WRITE_BEHIND_RETRIES = int(os.environ.get("WRITE_BEHIND_RETRIES", "3"))
+WRITE_BEHIND_RETRY_BACKOFF = 0.1
+
+logger = logging.getLogger(__name__)
+
+_queue = None
+_queue_lock = threading.Lock()
+
+class WriteBehindQueue:
+    """
+    Bounded in-memory queue of prediction rows drained by a background thread.
+    Rows are written with one executemany per batch, triggered by
+    WRITE_BEHIND_BATCH_SIZE rows or WRITE_BEHIND_FLUSH_MS since the oldest row.
+    """
+
+    def __init__(self, max_rows=WRITE_BEHIND_QUEUE_SIZE, batch_size=WRITE_BEHIND_BATCH_SIZE,
+                 flush_ms=WRITE_BEHIND_FLUSH_MS, writer=save_predictions, retries=WRITE_BEHIND_RETRIES):
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000.0
+        self.retries = retries
+        self._writer = writer
+        self._cond = threading.Condition()
+        self._pending = []
+        self._oldest_at = None
+        self._inflight = 0
+        # Rows are numbered in enqueue order; FIFO writes mean everything up to
+        # _committed_seq has been written (or dropped), so flush() waits on a number
+        self._enqueued_seq = 0
+        self._committed_seq = 0
+        self._flush_target = 0
+        self._closed = False
+
+        self.rows_written = 0
+        self.batches_written = 0
+        self.write_retries = 0
+        self.rows_dropped = 0
+        self.backpressure_waits = 0
+        self.sync_fallbacks = 0
+
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+
+    def enqueue(self, rows):
+        """Queue rows for writing; blocks while the queue is full (backpressure)."""
+        with self._cond:
+            if not self._closed and len(rows) <= self.max_rows:
+                if len(self._pending) + len(rows) > self.max_rows:
+                    self.backpressure_waits += 1
+                    room = self._cond.wait_for(
+                        lambda: self._closed or len(self._pending) + len(rows) <= self.max_rows,
+                        timeout=WRITE_BEHIND_PUT_TIMEOUT,
+                    )
+                else:
+                    room = True
+                if room and not self._closed:
+                    if not self._pending:
+                        self._oldest_at = time.monotonic()
+                    self._pending.extend(rows)
+                    self._enqueued_seq += len(rows)
+                    self._cond.notify_all()
+                    return
+            self.sync_fallbacks += 1
+        # Queue stayed full, is too small or is shut down: never drop a prediction, write it inline
+        self._writer(rows)
+
+    def flush(self):
+        """
+        Block until every row queued so far has been committed. Rows queued after
+        the call don't extend the wait, so readers can't be starved by writers.
+        """
+        with self._cond:
+            target = self._enqueued_seq
+            if self._committed_seq >= target:
+                return
+            self._flush_target = max(self._flush_target, target)
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._committed_seq >= target)
+
+    def _take_batch(self):
+        with self._cond:
+            while True:
+                if self._pending:
+                    due = self._oldest_at + self.flush_interval
+                    if (len(self._pending) >= self.batch_size or self._flush_target > self._committed_seq
+                            or self._closed or time.monotonic() >= due):
+                        break
+                    self._cond.wait(due - time.monotonic())
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            self._oldest_at = time.monotonic() if self._pending else None
+            self._inflight = len(batch)
+            self._cond.notify_all()
+            return batch
+
+    def _write(self, batch):
+        """Write a batch, retrying with backoff. Returns False once every attempt has failed."""
+        for attempt in range(self.retries + 1):
+            try:
+                self._writer(batch)
+                return True
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error(f"Write-behind dropped {len(batch)} prediction rows after "
+                                 f"{attempt + 1} failed attempts: {e}")
+                    return False
+                logger.warning(f"Write-behind batch of {len(batch)} rows failed, retrying: {e}")
+                with self._cond:
+                    self.write_retries += 1
+                time.sleep(WRITE_BEHIND_RETRY_BACKOFF * 2 ** attempt)
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            written = self._write(batch)
+            with self._cond:
+                self._inflight = 0
+                # Dropped rows still advance the sequence, or flush() would wait forever
+                self._committed_seq += len(batch)
+                if written:
+                    self.rows_written += len(batch)
+                    self.batches_written += 1
+                else:
+                    self.rows_dropped += len(batch)
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued_rows": len(self._pending),
+                "max_rows": self.max_rows,
+                "inflight_rows": self._inflight,
+                "rows_written": self.rows_written,
+                "batches_written": self.batches_written,
+                "write_retries": self.write_retries,
+                "rows_dropped": self.rows_dropped,
+                "backpressure_waits": self.backpressure_waits,
+                "sync_fallbacks": self.sync_fallbacks,
+            }
+
+    def close(self):
+        """Flush everything still queued and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
+
+def get_write_queue():
+    """Lazy-start the write-behind queue when WRITE_BEHIND is enabled."""
+    global _queue
+    if not WRITE_BEHIND:
+        return None
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WriteBehindQueue()
+    return _queue
+
+def persist_predictions(rows):
+    """
+    Save prediction rows, through the write-behind queue when it is enabled.
+    A failed write is logged, not raised: the caller's predictions are still returned.
+    """
+    queue = get_write_queue()
+    # With write-behind this times the enqueue, which is what the request waits for
+    with metrics.stage("db_insert"):
+        try:
+            if queue is None:
+                save_predictions(rows)
+            else:
+                queue.enqueue(rows)
+        except Exception as e:
+            logger.error(f"Error saving {len(rows)} prediction rows: {e}")
+
+def flush_pending_writes():
+    """Make queued rows visible to readers (read-your-writes for /history and /insights)."""
+    if _queue is not None:
+        _queue.flush()
+
+def close_write_queue():
+    global _queue
+    if _queue is not None:
+        _queue.close()
+        _queue = None
@@ -0,0 +1,14 @@
+"""
+One-shot backfill of the daily_prediction_stats rollup used by /insights.
+Run from the backend folder: python backfill_insights.py
+"""
+from app.database import DB_PATH, init_db, get_connection, rebuild_daily_rollups
+
+if __name__ == "__main__":
+    init_db()
+    conn = get_connection()
+    try:
+        groups = rebuild_daily_rollups(conn)
+        print(f"Rebuilt {groups} daily rollup rows in {DB_PATH}")
+    finally:
+        conn.close()
@@ -0,0 +1,181 @@
+"""
+Benchmark suite for the prediction hot path.
+Run from the backend folder:
+
+    python -m bench run --out bench/baselines/main.json
+    python -m bench run --out /tmp/current.json
+    python -m bench compare bench/baselines/main.json /tmp/current.json --threshold 0.15
+
+`compare` exits with status 1 when any stage regressed beyond the threshold.
+
+Load test a running server (open-loop, one phase per rate):
+
+    python -m bench load --url http://localhost:8001 --rate 10 50 100 --duration 30 --out /tmp/load.json
+    python -m bench load --log recorded.jsonl              # replay at the recorded timing
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from .corpus import DEFAULT_SEED
+
+GROUPS = ("text", "model", "http")
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+def _versions():
+    versions = {"python": platform.python_version()}
+    for name in ("numpy", "scipy", "sklearn", "fastapi"):
+        try:
+            versions[name] = __import__(name).__version__
+        except Exception:
+            versions[name] = None
+    return versions
+
+def run(args):
+    if args.model_version:
+        os.environ["MODEL_VERSION"] = args.model_version
+    # Imported late so MODEL_VERSION is seen by the registry
+    from .stages import StageBenchmarks
+
+    bench = StageBenchmarks(args.seed, scale=args.scale)
+    results = {}
+    for group in args.groups:
+        print(f"Running {group} benchmarks...")
+        results.update(getattr(bench, f"{group}_stages")())
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "seed": args.seed,
+            "scale": args.scale,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "versions": _versions(),
+        },
+        "results": results,
+    }
+    print(f"\n{'stage':32}{'p50 ms':>10}{'p95 ms':>10}{'items/s':>12}")
+    for stage, r in results.items():
+        print(f"{stage:32}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['items_per_s'] or 0:>12.0f}")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved: {args.out}")
+    return 0
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'stage':32}{'baseline':>12}{'current':>12}{'change':>10}")
+    for stage in sorted(set(baseline) | set(current)):
+        if stage not in baseline or stage not in current:
+            print(f"{stage:32}{'(only in ' + ('current' if stage in current else 'baseline') + ')':>34}")
+            continue
+        old, new = baseline[stage][args.metric], current[stage][args.metric]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(stage)
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{stage:32}{old:>12.3f}{new:>12.3f}{change:>+10.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%} ({args.metric}).")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} ({args.metric}).")
+    return 0
+
+def load(args):
+    from .load import parse_mix, print_phases, run_load
+
+    phases = run_load(
+        args.url, args.rate, args.duration, args.seed,
+        mix=parse_mix(args.mix) if args.mix else None,
+        log_path=args.log, speed=args.speed,
+        max_in_flight=args.max_in_flight, timeout=args.timeout,
+    )
+    print_phases(phases)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "url": args.url,
+            "seed": args.seed,
+            "log": args.log,
+            "mix": args.mix,
+            "max_in_flight": args.max_in_flight,
+            "platform": platform.platform(),
+        },
+        "phases": phases,
+    }
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved: {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.max_error_rate is not None and any(p["error_rate"] > args.max_error_rate for p in phases):
+        print(f"\nError rate above {args.max_error_rate:.2%} in at least one phase.")
+        return 1
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Prediction hot-path benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run the benchmarks and optionally save a JSON baseline")
+    run_parser.add_argument("--out", help="Where to write the JSON results")
+    run_parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Corpus seed")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="Multiplier on iterations (e.g. 0.2 for a quick run)")
+    run_parser.add_argument("--model-version", help="Registry version to benchmark (default: MODEL_VERSION / MODEL_PATH)")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser("compare", help="Compare two result files and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown, as a fraction")
+    compare_parser.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p95_ms", "mean_ms"])
+    compare_parser.set_defaults(func=compare)
+
+    load_parser = sub.add_parser("load", help="Open-loop load test against a running server")
+    load_parser.add_argument("--url", default="http://localhost:8001")
+    load_parser.add_argument("--rate", type=float, nargs="+", help="Arrival rates in req/s, one phase each")
+    load_parser.add_argument("--duration", type=float, default=30.0, help="Seconds per phase")
+    load_parser.add_argument("--log", help="Recorded request log (JSON lines) to replay instead of synthetic traffic")
+    load_parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up when replaying recorded timing")
+    load_parser.add_argument("--mix", help="Synthetic mix, e.g. predict=70,history=15,insights=10,delete=5")
+    load_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    load_parser.add_argument("--max-in-flight", type=int, default=256, help="Client-side cap; arrivals beyond it are dropped")
+    load_parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    load_parser.add_argument("--max-error-rate", type=float, help="Exit with status 1 if any phase exceeds this error rate")
+    load_parser.add_argument("--out", help="Where to write the JSON report (printed to stdout otherwise)")
+    load_parser.set_defaults(func=load)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Deterministic synthetic corpus for the benchmarks.
+The same seed always yields the same texts, so runs on different commits are comparable.
+"""
+import csv
+import os
+import random
+
+from app.lexicon_matcher import ANXIETY_SIGNALS, DISTRESS_KEYWORDS, POSITIVE_SIGNALS, RISK_PHRASES
+from app.word_lexicon import LEXICON_FILES
+
+DEFAULT_SEED = 1337
+
+LENGTHS = {
+    # name: (min words, max words)
+    "short": (3, 10),
+    "medium": (20, 60),
+    "long": (200, 400),
+}
+
+FILLER_WORDS = (
+    "i the a to and of my it that was is in me for with but so this just have like at about "
+    "today work people class meeting friends family weekend morning night phone call talk "
+    "really think know feel going want time day week home school office lunch dinner walk "
+    "always never sometimes again still maybe probably something everyone someone nothing"
+).split()
+PUNCTUATION = [".", ",", "!", "?", "...", ""]
+
+def lexicon_words():
+    words = []
+    for path in LEXICON_FILES.values():
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                words.extend(row['word'].strip().lower() for row in csv.DictReader(f))
+    return sorted(set(words)) or list(ANXIETY_SIGNALS)
+
+class CorpusGenerator:
+    """
+    Mixes:
+      neutral  - filler words only
+      lexicon  - ~40% words from the anxiety lexicon CSVs and signal lists
+      risk     - neutral text with one high-risk phrase spliced in
+    """
+
+    def __init__(self, seed=DEFAULT_SEED):
+        self.seed = seed
+        self.lexicon = lexicon_words() + list(ANXIETY_SIGNALS) + list(POSITIVE_SIGNALS) + list(DISTRESS_KEYWORDS)
+
+    def _text(self, rng, length, mix):
+        lo, hi = LENGTHS[length]
+        words = []
+        for _ in range(rng.randint(lo, hi)):
+            if mix == "lexicon" and rng.random() < 0.4:
+                words.append(rng.choice(self.lexicon))
+            else:
+                words.append(rng.choice(FILLER_WORDS))
+            if rng.random() < 0.12:
+                words[-1] += rng.choice(PUNCTUATION)
+        if mix == "risk":
+            words.insert(rng.randrange(len(words) + 1), rng.choice(RISK_PHRASES))
+        text = " ".join(words)
+        return text[:1].upper() + text[1:]
+
+    def texts(self, count, length="medium", mix="lexicon"):
+        # Each (length, mix) stream has its own seed so adding a stream doesn't shift the others
+        rng = random.Random(f"{self.seed}:{length}:{mix}")
+        return [self._text(rng, length, mix) for _ in range(count)]
+
+    def mixed(self, count):
+        """Realistic blend: mostly short/medium, a few long, ~5% risk phrases."""
+        rng = random.Random(f"{self.seed}:mixed")
+        out = []
+        for _ in range(count):
+            length = rng.choices(list(LENGTHS), weights=[5, 4, 1])[0]
+            mix = rng.choices(["neutral", "lexicon", "risk"], weights=[45, 50, 5])[0]
+            out.append(self._text(rng, length, mix))
+        return out
@@ -0,0 +1,276 @@
+"""
+Open-loop load generator for a running backend. Requests are sent on a fixed
+arrival schedule whatever the server's response times, and latency is measured
+from each request's scheduled time, so a slow server shows up as tail latency
+instead of a politely lower request rate.
+"""
+import asyncio
+import json
+import random
+import re
+from collections import namedtuple
+
+from .corpus import CorpusGenerator
+
+DEFAULT_URL = "http://localhost:8001"
+DEFAULT_MIX = {"predict": 70, "history": 15, "insights": 10, "delete": 5}
+
+# One request to send. `at` is the offset in seconds from the start of a recorded log (None for synthetic traffic).
+RequestSpec = namedtuple("RequestSpec", ["method", "path", "json", "params", "at"])
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+def parse_mix(value):
+    """'predict=70,history=15' -> {'predict': 70.0, 'history': 15.0}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown request kind in mix: {name.strip()!r} (expected {', '.join(DEFAULT_MIX)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def load_log(path):
+    """
+    Reads a recorded request log, one JSON object per line:
+
+        {"method": "POST", "path": "/predict", "json": {"text": "..."}, "at": 0.42}
+        {"method": "GET", "path": "/history", "params": {"limit": 20}, "at": 0.61}
+        {"method": "DELETE", "path": "/history/{id}", "at": 0.9}
+
+    `at` (seconds since the start of the recording) is optional. A `{id}` in the
+    path is filled with the id of a row created during the run.
+    """
+    specs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                specs.append(RequestSpec(
+                    entry.get("method", "GET").upper(),
+                    entry["path"],
+                    entry.get("json", entry.get("body")),
+                    entry.get("params"),
+                    entry.get("at"),
+                ))
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"{path}:{line_no}: invalid log entry ({e})")
+    return specs
+
+def endpoint_name(spec):
+    return f"{spec.method} {_ID_SEGMENT.sub('/{id}', spec.path)}"
+
+def latency_stats(latencies):
+    """p50/p95/p99/max in milliseconds for a list of latencies in seconds."""
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None, "mean_ms": None}
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+    }
+
+class SyntheticTraffic:
+    """Endless stream of /predict, /history, /insights and DELETE /history/{id} requests in the given proportions."""
+
+    def __init__(self, seed, mix=None):
+        self.rng = random.Random(f"{seed}:load")
+        self.mix = mix or DEFAULT_MIX
+        self.texts = CorpusGenerator(seed).mixed(2000)
+
+    def next(self):
+        kind = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if kind == "predict":
+            return RequestSpec("POST", "/predict", {"text": self.rng.choice(self.texts)}, None, None)
+        if kind == "history":
+            return RequestSpec("GET", "/history", None, {"limit": 20}, None)
+        if kind == "insights":
+            return RequestSpec("GET", "/insights", None, None, None)
+        return RequestSpec("DELETE", "/history/{id}", None, None, None)
+
+class LoadGenerator:
+    """
+    Fires requests at the server on an open-loop schedule and records per-request
+    outcomes. DELETE requests only target rows this run created: ids are collected
+    from /history responses whose text was sent by a /predict of the same run.
+    """
+
+    def __init__(self, url=DEFAULT_URL, max_in_flight=256, timeout=30.0):
+        self.url = url.rstrip("/")
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self._sent_texts = set()
+        self._deletable = []
+        self._seen_ids = set()
+
+    def _resolve(self, spec):
+        """Concrete (method, path, json, params), or None when no created row is left to delete."""
+        path = spec.path
+        if "{id}" in path:
+            if not self._deletable:
+                return None
+            path = path.replace("{id}", str(self._deletable.pop()))
+        if spec.method == "POST" and spec.path == "/predict" and spec.json:
+            self._sent_texts.add(spec.json.get("text"))
+        return spec.method, path, spec.json, spec.params
+
+    def _harvest(self, spec, response):
+        if spec.method != "GET" or spec.path != "/history" or response.status_code != 200:
+            return
+        try:
+            rows = response.json()
+        except ValueError:
+            return
+        for row in rows:
+            if row.get("text") in self._sent_texts and row.get("id") not in self._seen_ids:
+                self._seen_ids.add(row["id"])
+                self._deletable.append(row["id"])
+
+    async def _send(self, client, spec, request, scheduled, records):
+        method, path, body, params = request
+        record = {"endpoint": endpoint_name(spec), "status": None, "error": None}
+        try:
+            response = await client.request(method, path, json=body, params=params)
+            record["status"] = response.status_code
+            self._harvest(spec, response)
+        except Exception as e:
+            record["error"] = type(e).__name__
+        record["latency"] = asyncio.get_running_loop().time() - scheduled
+        records.append(record)
+
+    async def run_phase(self, schedule, span=None):
+        """
+        `schedule` is a list of (offset seconds, RequestSpec) spread over `span`
+        seconds. Returns the phase report. Requests that would exceed
+        max_in_flight are counted as dropped.
+        """
+        import httpx
+
+        records = []
+        dropped = skipped = 0
+        tasks = set()
+        limits = httpx.Limits(max_connections=self.max_in_flight, max_keepalive_connections=self.max_in_flight)
+        async with httpx.AsyncClient(base_url=self.url, timeout=self.timeout, limits=limits) as client:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for offset, spec in schedule:
+                scheduled = start + offset
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(tasks) >= self.max_in_flight:
+                    dropped += 1
+                    continue
+                request = self._resolve(spec)
+                if request is None:
+                    skipped += 1
+                    continue
+                task = asyncio.create_task(self._send(client, spec, request, scheduled, records))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            sent_for = loop.time() - start
+            if tasks:
+                await asyncio.gather(*list(tasks))
+            wall = loop.time() - start
+        return self._report(records, schedule, span, sent_for, wall, dropped, skipped)
+
+    @staticmethod
+    def _report(records, schedule, span, sent_for, wall, dropped, skipped):
+        span = span or (schedule[-1][0] if schedule else 0.0)
+        ok = [r for r in records if r["error"] is None and r["status"] < 400]
+        by_endpoint = {}
+        for r in records:
+            by_endpoint.setdefault(r["endpoint"], []).append(r)
+
+        def summary(rows):
+            failed = [r for r in rows if r["error"] is not None or r["status"] >= 400]
+            errors = {}
+            for r in failed:
+                key = r["error"] or str(r["status"])
+                errors[key] = errors.get(key, 0) + 1
+            return {
+                "requests": len(rows),
+                "errors": len(failed),
+                "error_rate": len(failed) / len(rows) if rows else 0.0,
+                "error_kinds": errors,
+                "latency": latency_stats([r["latency"] for r in rows]),
+            }
+
+        return {
+            "scheduled": len(schedule),
+            "offered_rps": len(schedule) / span if span else None,
+            "sent_for_s": sent_for,
+            "wall_s": wall,
+            "throughput_rps": len(ok) / wall if wall else None,
+            "dropped": dropped,
+            "skipped_deletes": skipped,
+            **summary(records),
+            "endpoints": {name: summary(rows) for name, rows in sorted(by_endpoint.items())},
+        }
+
+def poisson_schedule(source, rate, duration, seed):
+    """Exponential inter-arrival gaps at `rate` req/s for `duration` seconds; `source()` supplies each request."""
+    rng = random.Random(f"{seed}:arrivals:{rate}")
+    schedule = []
+    t = rng.expovariate(rate)
+    while t < duration:
+        schedule.append((t, source()))
+        t += rng.expovariate(rate)
+    return schedule
+
+def recorded_schedule(specs, speed=1.0):
+    """Replays a log at its recorded offsets, `speed` times faster."""
+    first = specs[0].at if specs else 0.0
+    return [((spec.at - first) / speed, spec) for spec in specs]
+
+def cycle(specs):
+    index = [0]
+    def source():
+        spec = specs[index[0] % len(specs)]
+        index[0] += 1
+        return spec
+    return source
+
+def run_load(url, rates, duration, seed, mix=None, log_path=None, speed=1.0, max_in_flight=256, timeout=30.0):
+    """
+    One phase per rate (open-loop Poisson arrivals), or a single timed replay of
+    `log_path` when no rate is given. Returns the phase reports.
+    """
+    generator = LoadGenerator(url, max_in_flight=max_in_flight, timeout=timeout)
+    specs = load_log(log_path) if log_path else None
+    if specs is not None and not specs:
+        raise ValueError(f"{log_path} has no requests")
+
+    phases = []
+    if not rates:
+        if specs is None or any(spec.at is None for spec in specs):
+            raise ValueError("--rate is required unless replaying a log where every entry has 'at'")
+        print(f"Replaying {len(specs)} recorded requests at {speed}x against {url}...")
+        report = asyncio.run(generator.run_phase(recorded_schedule(specs, speed)))
+        phases.append({"mode": "replay", "speed": speed, **report})
+        return phases
+
+    source = cycle(specs) if specs else SyntheticTraffic(seed, mix).next
+    for rate in rates:
+        print(f"Offering {rate} req/s for {duration}s against {url}...")
+        report = asyncio.run(generator.run_phase(poisson_schedule(source, rate, duration, seed), duration))
+        phases.append({"mode": "replay-rate" if specs else "synthetic", "rate": rate, **report})
+    return phases
+
+def print_phases(phases):
+    print(f"\n{'phase':>12}{'sent':>8}{'rps':>9}{'err %':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for phase in phases:
+        name = f"{phase['rate']}/s" if "rate" in phase else f"{phase['speed']}x"
+        lat = phase["latency"]
+        fmt = lambda v: f"{v:>10.1f}" if v is not None else f"{'-':>10}"
+        print(f"{name:>12}{phase['requests']:>8}{phase['throughput_rps'] or 0:>9.1f}{phase['error_rate'] * 100:>8.2f}"
+              f"{fmt(lat['p50_ms'])}{fmt(lat['p95_ms'])}{fmt(lat['p99_ms'])}{fmt(lat['max_ms'])}")
+        if phase["dropped"] or phase["skipped_deletes"]:
+            print(f"{'':>12}dropped (client at max in-flight): {phase['dropped']}, "
+                  f"deletes skipped (no created row yet): {phase['skipped_deletes']}")
@@ -0,0 +1,136 @@
+"""
+One benchmark per stage of the /predict hot path, from text cleaning up to
+end-to-end HTTP calls through an in-process ASGI client.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from .corpus import CorpusGenerator
+
+PROBA_BATCH_SIZES = [1, 8, 64, 256, 1024]
+
+def summarize(durations, items_per_call=1):
+    """Latency stats (milliseconds per call) and throughput for a list of call durations in seconds."""
+    ordered = sorted(durations)
+    total = sum(ordered)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {
+        "calls": len(ordered),
+        "items_per_call": items_per_call,
+        "mean_ms": total / len(ordered) * 1000,
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "items_per_s": len(ordered) * items_per_call / total if total else None,
+    }
+
+def time_calls(fn, args_list, items_per_call=1, warmup=3):
+    for args in args_list[:warmup]:
+        fn(*args)
+    durations = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        durations.append(time.perf_counter() - started)
+    return summarize(durations, items_per_call)
+
+class StageBenchmarks:
+    def __init__(self, seed, scale=1.0):
+        self.corpus = CorpusGenerator(seed)
+        self.scale = scale
+
+    def n(self, count):
+        return max(5, int(count * self.scale))
+
+    def text_stages(self):
+        from app.ml_utils import check_risk_phrases, clean_text
+        from app.prediction_system import predict_with_words
+
+        results = {}
+        for length, count in (("short", 2000), ("medium", 1000), ("long", 100)):
+            texts = self.corpus.texts(self.n(count), length, "lexicon")
+            results[f"clean_text/{length}"] = time_calls(clean_text, [(t,) for t in texts])
+
+        mixed = self.corpus.mixed(self.n(2000))
+        results["check_risk_phrases/mixed"] = time_calls(check_risk_phrases, [(t,) for t in mixed])
+        risk = self.corpus.texts(self.n(1000), "medium", "risk")
+        results["check_risk_phrases/risk"] = time_calls(check_risk_phrases, [(t,) for t in risk])
+
+        for length, count in (("short", 1000), ("medium", 500)):
+            texts = self.corpus.texts(self.n(count), length, "lexicon")
+            results[f"predict_with_words/{length}"] = time_calls(
+                predict_with_words, [(t, "Moderate Anxiety", 0.7) for t in texts])
+        return results
+
+    def model_stages(self):
+        from app.ml_utils import analyze_anxiety, clean_text, get_model
+
+        model = get_model()
+        if model is None:
+            print("Model not available; skipping model stages.")
+            return {}
+
+        results = {}
+        cleaned = [clean_text(t) for t in self.corpus.mixed(self.n(4096))]
+        cleaned = [c for c in cleaned if c] or ["feel nervous"]
+        for size in PROBA_BATCH_SIZES:
+            calls = max(3, len(cleaned) // size)
+            batches = [([cleaned[(i * size + j) % len(cleaned)] for j in range(size)],) for i in range(calls)]
+            results[f"predict_proba/batch_{size}"] = time_calls(model.predict_proba, batches, items_per_call=size)
+
+        texts = self.corpus.mixed(self.n(300))
+        results["analyze_anxiety/mixed"] = time_calls(analyze_anxiety, [(t,) for t in texts])
+        return results
+
+    def http_stages(self, seed_rows=5000):
+        return asyncio.run(self._http_stages(seed_rows))
+
+    async def _http_stages(self, seed_rows):
+        """/predict, /history and /insights through httpx's in-process ASGI transport on a scratch database."""
+        import httpx
+
+        from app import database
+        from app.main import app
+
+        tmpdir = tempfile.mkdtemp(prefix="bench-")
+        database.DB_PATH = os.path.join(tmpdir, "bench.db")
+        try:
+            async with app.router.lifespan_context(app):
+                # Realistic history/insights sizes: seed rows spread over ~60 days
+                seed = self.corpus.mixed(self.n(seed_rows))
+                labels = ["Low Anxiety", "Moderate Anxiety", "High Anxiety"]
+                database.save_predictions([
+                    (text, labels[i % 3], 0.5 + (i % 50) / 100, "[]",
+                     f"2026-{1 + (i // 1000) % 2:02d}-{1 + i % 28:02d}T12:00:00+00:00", "bench")
+                    for i, text in enumerate(seed)
+                ])
+
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                    results = {}
+                    bodies = [{"text": t} for t in self.corpus.mixed(self.n(300))]
+                    results["http/predict"] = await self._time_requests(
+                        [lambda b=b: client.post("/predict", json=b) for b in bodies])
+                    results["http/history"] = await self._time_requests(
+                        [lambda: client.get("/history", params={"limit": 20})] * self.n(300))
+                    results["http/insights"] = await self._time_requests(
+                        [lambda: client.get("/insights")] * self.n(300))
+                    return results
+        finally:
+            database.close_pool()
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    @staticmethod
+    async def _time_requests(requests, warmup=3):
+        for request in requests[:warmup]:
+            await request()
+        durations = []
+        for request in requests:
+            started = time.perf_counter()
+            response = await request()
+            durations.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.request.url} returned {response.status_code}: {response.text[:200]}")
+        return summarize(durations)
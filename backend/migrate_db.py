@@ -0,0 +1,15 @@
+"""
+Apply pending schema migrations to the SQLite database (also run on every API startup).
+Run from the backend folder: python migrate_db.py
+"""
+from app.database import DB_PATH, init_db, get_connection
+
+if __name__ == "__main__":
+    init_db()
+    conn = get_connection()
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        rows = conn.execute("SELECT COUNT(*) FROM predictions WHERE created_at IS NULL").fetchone()[0]
+        print(f"{DB_PATH} is at schema version {version} ({rows} rows without a normalized timestamp)")
+    finally:
+        conn.close()
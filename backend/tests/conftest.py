@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the backend the same way the server does (`app.*` from the backend folder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """A migrated scratch SQLite database behind the shared connection pool."""
+    from app import database
+
+    database.close_pool()
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "predictions.db"))
+    database.init_db()
+    yield database
+    database.close_pool()
+
+class IdentityLemmatizer:
+    def lemmatize(self, token):
+        return token
+
+@pytest.fixture
+def offline_nlp(monkeypatch):
+    """Stand-ins for the NLTK corpora so text preprocessing runs without downloads."""
+    import nltk
+
+    from app import ml_utils
+
+    monkeypatch.setattr(ml_utils, "lemmatizer", IdentityLemmatizer())
+    monkeypatch.setattr(ml_utils, "stop_words", {"a", "an", "and", "i", "in", "is", "me", "my", "the", "to", "when"})
+    monkeypatch.setattr(nltk, "download", lambda *a, **k: False)
+    ml_utils._cached_lemma.cache_clear()
+    yield ml_utils
+    ml_utils._cached_lemma.cache_clear()
+
+@pytest.fixture
+def client(temp_db):
+    """API client over a scratch database; startup (model loading, warm-up) is not run."""
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    return TestClient(main.app)
+
+@pytest.fixture
+def insert_predictions(temp_db):
+    """Saves (text, prediction, confidence, timestamp) rows through the normal insert path."""
+    def insert(rows):
+        temp_db.save_predictions([(text, pred, conf, "[]", ts, "v1") for text, pred, conf, ts in rows])
+    return insert
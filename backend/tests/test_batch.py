@@ -0,0 +1,16 @@
+from app import main
+from app.models import BATCH_MAX_TEXTS
+
+async def fake_score(texts, model_version=None):
+    return [{"prediction": "Low Anxiety", "confidence": 0.5} for _ in texts]
+
+def test_batch_over_the_limit_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(main, "score_texts_async", fake_score)
+    response = client.post("/predict/batch", json={"texts": ["calm"] * (BATCH_MAX_TEXTS + 1)})
+    assert response.status_code == 422
+
+def test_batch_at_the_limit_is_scored(client, monkeypatch):
+    monkeypatch.setattr(main, "score_texts_async", fake_score)
+    response = client.post("/predict/batch", json={"texts": ["calm"] * BATCH_MAX_TEXTS})
+    assert response.status_code == 200
+    assert len(response.json()) == BATCH_MAX_TEXTS
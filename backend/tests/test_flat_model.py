@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import VotingClassifier
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import FeatureUnion, Pipeline
+from sklearn.svm import LinearSVC
+
+from app.flat_model import export_flat_model, load_flat_model
+
+# A tiny three-class fixture corpus: each text mixes words from its class with shared filler
+_VOCAB = [
+    "calm relaxed fine rested happy peaceful steady content".split(),
+    "nervous uneasy worried tense restless awkward unsure shy".split(),
+    "panic terrified dread shaking overwhelmed heart racing cannot breathe".split(),
+]
+_FILLER = "i feel today at work with people when talking in class about the meeting".split()
+
+def _corpus(seed, n):
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n) % 3
+    texts = [" ".join(rng.choice(_VOCAB[label] * 2 + _FILLER, size=rng.integers(3, 12))) for label in labels]
+    return texts, labels
+
+TEXTS, LABELS = _corpus(3, 120)
+HELD_OUT = _corpus(4, 60)[0] + ["", "zzz unseen tokens only", "panic " * 50]
+
+def _features(kind):
+    if kind == "word":
+        return TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)
+    if kind == "union":
+        return FeatureUnion([("word", TfidfVectorizer()), ("char", TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4)))])
+    return Pipeline([("hash", HashingVectorizer(n_features=2 ** 12, alternate_sign=False, norm=None)),
+                     ("idf", TfidfTransformer(sublinear_tf=True))])
+
+def _pipeline(kind, method):
+    clf = VotingClassifier([
+        ("lr", LogisticRegression(max_iter=500)),
+        ("svc", CalibratedClassifierCV(LinearSVC(), method=method, cv=3)),
+        ("nb", MultinomialNB()),
+    ], voting="soft", weights=[3, 3, 1])
+    return Pipeline([("features", _features(kind)), ("clf", clf)]).fit(TEXTS, LABELS)
+
+@pytest.fixture(scope="module", params=[("word", "isotonic"), ("union", "sigmoid"), ("hashing", "isotonic")],
+                ids=lambda p: "-".join(p))
+def exported(request, tmp_path_factory):
+    pipeline = _pipeline(*request.param)
+    out_dir = str(tmp_path_factory.mktemp("flat") / "nlp_anxiety_model_v0.flat")
+    export_flat_model(pipeline, out_dir)
+    return pipeline, out_dir
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_flat_model_matches_the_pipeline(exported, mmap):
+    pipeline, out_dir = exported
+    expected = pipeline.predict_proba(HELD_OUT)
+    actual = load_flat_model(out_dir, mmap=mmap).predict_proba(HELD_OUT)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9)
+
+def test_fused_scorer_matches_the_pipeline(exported):
+    pipeline, out_dir = exported
+    expected = pipeline.predict_proba(HELD_OUT)
+    actual = load_flat_model(out_dir, fast=True).predict_proba(HELD_OUT)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-6)
+    np.testing.assert_array_equal(actual.argmax(axis=1), expected.argmax(axis=1))
+
+def test_export_replaces_an_existing_artifact(exported, tmp_path):
+    pipeline, out_dir = exported
+    manifest = export_flat_model(pipeline, out_dir)
+    assert manifest["weights"] == [3, 3, 1]
+    assert not os.path.exists(out_dir + ".tmp") and not os.path.exists(out_dir + ".old")
+    np.testing.assert_allclose(load_flat_model(out_dir).predict_proba(HELD_OUT[:5]),
+                               pipeline.predict_proba(HELD_OUT[:5]), rtol=0, atol=1e-9)
+
+def test_fused_matrix_is_memory_mapped_from_the_export(exported):
+    _, out_dir = exported
+    fused = load_flat_model(out_dir, fast=True).fused
+    assert isinstance(fused.coef, np.memmap)
+
+def test_exports_without_a_fused_matrix_still_load(exported, tmp_path):
+    import json
+    import shutil
+
+    pipeline, out_dir = exported
+    old_dir = str(tmp_path / "old.flat")
+    shutil.copytree(out_dir, old_dir)
+    manifest_path = os.path.join(old_dir, "manifest.json")
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    del manifest["fused"]
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    np.testing.assert_allclose(load_flat_model(old_dir, fast=True).predict_proba(HELD_OUT),
+                               pipeline.predict_proba(HELD_OUT), rtol=0, atol=1e-6)
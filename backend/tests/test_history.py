@@ -0,0 +1,36 @@
+def _page(client, **params):
+    response = client.get("/history", params=params)
+    assert response.status_code == 200
+    return [row["id"] for row in response.json()], response.headers.get("x-next-cursor")
+
+def test_cursor_walks_every_row_newest_first(client, temp_db, insert_predictions):
+    insert_predictions([(f"text {i}", "Low Anxiety", 0.5, "2026-10-01T08:00:00+00:00") for i in range(45)])
+    with temp_db.pooled_connection() as conn:
+        expected = [row[0] for row in conn.execute("SELECT id FROM predictions ORDER BY id DESC")]
+
+    seen, sizes, cursor = [], [], None
+    while True:
+        ids, cursor = _page(client, limit=20, **({"cursor": cursor} if cursor else {}))
+        seen.extend(ids)
+        sizes.append(len(ids))
+        if cursor is None:
+            break
+    assert seen == expected
+    assert sizes == [20, 20, 5]
+
+def test_rows_inserted_between_pages_do_not_shift_the_next_page(client, insert_predictions):
+    insert_predictions([(f"text {i}", "Low Anxiety", 0.5, "2026-10-01T08:00:00+00:00") for i in range(10)])
+    first, cursor = _page(client, limit=4)
+    insert_predictions([("newer", "High Anxiety", 0.9, "2026-10-02T08:00:00+00:00")])
+    second, _ = _page(client, limit=4, cursor=cursor)
+    assert second == [first[-1] - n for n in range(1, 5)]
+
+def test_before_id_and_default_page(client, insert_predictions):
+    insert_predictions([(f"text {i}", "Low Anxiety", 0.5, "2026-10-01T08:00:00+00:00") for i in range(25)])
+    ids, cursor = _page(client)
+    assert len(ids) == 20 and cursor is not None
+    assert _page(client, before_id=3)[0] == [2, 1]
+
+def test_bad_cursor_and_page_size_are_rejected(client):
+    assert client.get("/history", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/history", params={"limit": 101}).status_code == 422
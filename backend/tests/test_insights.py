@@ -0,0 +1,51 @@
+ROWS = [
+    ("a", "High Anxiety", 0.9, "2026-10-01T08:00:00+00:00"),
+    ("b", "Low Anxiety", 0.7, "2026-10-01T23:59:00+00:00"),
+    ("c", "Moderate Anxiety", 0.6, "2026-10-02T10:00:00+00:00"),
+    ("d", "High Anxiety", 0.8, "2026-10-02 11:00:00"),
+    ("e", "Uncertain", 0.4, "2026-10-03T09:00:00+00:00"),
+    ("f", "High Anxiety", 0.95, "2026-10-03T10:00:00+00:00"),
+]
+
+def _scanned(database):
+    """The pre-rollup /insights answer: aggregate the predictions table directly."""
+    with database.pooled_connection() as conn:
+        distribution = {row[0]: row[1] for row in conn.execute(
+            "SELECT prediction, COUNT(*) FROM predictions GROUP BY prediction")}
+        trends = [tuple(row) for row in conn.execute("""
+            SELECT date(timestamp),
+                   SUM(prediction = 'High Anxiety'), SUM(prediction = 'Moderate Anxiety'), SUM(prediction = 'Low Anxiety')
+            FROM predictions GROUP BY 1 ORDER BY 1
+        """)]
+    return distribution, trends
+
+def _served(client):
+    body = client.get("/insights").json()
+    distribution = {row["_id"] + ("" if row["_id"] == "Uncertain" else " Anxiety"): row["count"]
+                    for row in body["anxiety_distribution"]}
+    trends = [(row["day"], row["High"], row["Moderate"], row["Low"]) for row in body["daily_trends"]]
+    return distribution, trends
+
+def test_rollup_matches_a_full_scan_through_inserts_and_deletes(client, temp_db, insert_predictions):
+    insert_predictions(ROWS)
+    assert _served(client) == _scanned(temp_db)
+
+    with temp_db.pooled_connection() as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM predictions WHERE text IN ('c', 'e')")]
+    for item_id in ids:
+        assert client.delete(f"/history/{item_id}").status_code == 200
+    served = _served(client)
+    assert served == _scanned(temp_db)
+    assert "Uncertain" not in served[0]
+    assert [day for day, *_ in served[1]] == ["2026-10-01", "2026-10-02", "2026-10-03"]
+
+def test_deleting_a_missing_item_is_404(client, temp_db, insert_predictions):
+    insert_predictions(ROWS[:1])
+    assert client.delete("/history/999").status_code == 404
+    assert _served(client) == _scanned(temp_db)
+
+def test_migrated_schema_keeps_no_unused_predictions_indexes(temp_db):
+    with temp_db.pooled_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(temp_db.MIGRATIONS)
+        indexes = [row[1] for row in conn.execute("PRAGMA index_list(predictions)")]
+    assert not [name for name in indexes if not name.startswith("sqlite_autoindex")]
@@ -0,0 +1,48 @@
+import pytest
+
+from app import ml_utils
+
+class FakeLemmatizer:
+    available = False
+
+    def lemmatize(self, token):
+        if not self.available:
+            raise LookupError("Resource wordnet not found.")
+        return token.rstrip("s")
+
+@pytest.fixture
+def lemmas(monkeypatch):
+    import nltk
+
+    fake = FakeLemmatizer()
+    downloads = []
+    monkeypatch.setattr(ml_utils, "lemmatizer", fake)
+    monkeypatch.setattr(ml_utils, "_lemma_table", {"worries": "worry"})
+    monkeypatch.setattr(ml_utils, "_wordnet_retry_at", 0.0)
+    monkeypatch.setattr(nltk, "download", lambda *a, **k: downloads.append(a) or False)
+    ml_utils._cached_lemma.cache_clear()
+    yield fake, downloads
+    ml_utils._cached_lemma.cache_clear()
+
+def test_lemma_table_hits_never_touch_wordnet(lemmas):
+    _, downloads = lemmas
+    assert ml_utils.lemmatize_token("worries") == "worry"
+    assert downloads == []
+
+def test_missing_wordnet_is_downloaded_lazily_and_not_cached(lemmas):
+    fake, downloads = lemmas
+    assert ml_utils.lemmatize_token("nerves") == "nerves"
+    assert downloads == [("wordnet",)]
+    assert ml_utils._cached_lemma.cache_info().currsize == 0
+
+    # Once WordNet is available the same token is lemmatized, not served from a degraded cache entry
+    fake.available = True
+    ml_utils._wordnet_retry_at = 0.0
+    assert ml_utils.lemmatize_token("nerves") == "nerve"
+    assert ml_utils._cached_lemma.cache_info().currsize == 1
+
+def test_download_is_not_retried_on_every_token(lemmas):
+    _, downloads = lemmas
+    for token in ("nerves", "hands", "eyes"):
+        assert ml_utils.lemmatize_token(token) == token
+    assert len(downloads) == 1
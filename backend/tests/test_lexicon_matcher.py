@@ -0,0 +1,57 @@
+import random
+import re
+
+import pytest
+
+from app.lexicon_matcher import LEXICONS, MultiPatternMatcher, scan_text
+
+def _regex_scan(text_lower):
+    """The per-phrase checks the automaton replaced: \\b...\\b regexes or substring tests."""
+    found = {}
+    for category, (phrases, whole_word) in LEXICONS.items():
+        if whole_word:
+            found[category] = [p for p in phrases if re.search(r'\b' + re.escape(p) + r'\b', text_lower)]
+        else:
+            found[category] = [p for p in phrases if p in text_lower]
+    return found
+
+def _random_texts(count, seed=7):
+    rng = random.Random(seed)
+    phrases = [p for phrases, _ in LEXICONS.values() for p in phrases]
+    glue = [" ", "", "_", "-", "'", ".", "x", "s", "é", "9", "\n", "  "]
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 8)):
+            phrase = rng.choice(phrases)
+            if rng.random() < 0.3:
+                # Fragments and overlaps exercise the failure links
+                cut = rng.randint(1, len(phrase))
+                phrase = phrase[:cut] if rng.random() < 0.5 else phrase[-cut:]
+            parts.append(phrase)
+            parts.append(rng.choice(glue))
+        texts.append("".join(parts))
+    return texts
+
+@pytest.mark.parametrize("text", [
+    "",
+    "i want to die",
+    "judgement day, judged by everyone",
+    "heartbeat racing; my heart is racing",
+    "fine_tuned and well-known but ok.",
+    "can't stopping the breakdownpain",
+    "commit suicide / suicide",
+    "social_anxiety socially awkward",
+    "café calm",
+])
+def test_matches_the_regex_scan(text):
+    assert scan_text(text) == _regex_scan(text)
+
+def test_matches_the_regex_scan_on_generated_text():
+    for text in _random_texts(2000):
+        assert scan_text(text) == _regex_scan(text), text
+
+def test_overlapping_and_suffix_phrases():
+    matcher = MultiPatternMatcher({"a": (["he", "she", "hers", "his"], False), "b": (["she"], True)})
+    assert matcher.scan("ushers") == {"a": ["he", "she", "hers"], "b": []}
+    assert matcher.scan("u she rs") == {"a": ["he", "she"], "b": ["she"]}
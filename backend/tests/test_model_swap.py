@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from sklearn.dummy import DummyClassifier
+
+from app import inference_executor, ml_utils
+from app.model_registry import ModelRegistry
+
+def _write_model(directory, version, prior):
+    model = DummyClassifier(strategy="prior").fit(np.zeros((len(prior), 1)), prior)
+    with open(os.path.join(directory, f"nlp_anxiety_model_{version}.pkl"), 'wb') as f:
+        pickle.dump(model, f)
+
+def _wait_for_activation(registry, timeout=10):
+    deadline = time.monotonic() + timeout
+    while registry._activation["state"] == "loading":
+        assert time.monotonic() < deadline, "activation never finished"
+        time.sleep(0.01)
+    return registry._activation
+
+@pytest.fixture
+def registry(tmp_path, offline_nlp, monkeypatch):
+    monkeypatch.setattr(ml_utils, "initialize_nltk", lambda: True)
+    _write_model(tmp_path, "v1", [0, 0, 1, 2])
+    _write_model(tmp_path, "v2", [2, 2, 1, 0])
+    return ModelRegistry(model_dir=str(tmp_path), default_version="v1")
+
+def test_swap_installs_the_warmed_handle(registry):
+    assert registry.get().version == "v1"
+    warmed = []
+
+    registry.activate("v2", warm=warmed.append)
+    assert _wait_for_activation(registry)["state"] == "active"
+
+    assert warmed == ["v2"]
+    assert registry.active_version == "v2"
+    # The swap installs the loaded model, so get() doesn't load on the request path
+    assert registry._active is registry._loaded["v2"]
+    assert registry.get() is registry._active
+    assert registry.swaps == 1
+
+def test_default_warm_up_scores_before_swapping(registry):
+    registry.activate("v2")
+    assert _wait_for_activation(registry)["state"] == "active"
+    assert registry.get().version == "v2"
+    assert registry.get().predict_proba(["anything"])[0].argmax() == 2
+
+def test_failed_warm_up_keeps_the_active_model(registry):
+    active = registry.get()
+
+    def warm(version):
+        raise RuntimeError("1 of 2 inference workers reported in")
+
+    registry.activate("v2", warm=warm)
+    activation = _wait_for_activation(registry)
+    assert activation["state"] == "failed"
+    assert "reported in" in activation["error"]
+    assert registry.get() is active and registry.swaps == 0
+
+def test_replaced_artifact_is_reloaded(registry, tmp_path):
+    old = registry.get("v2")
+    assert old.predict_proba(["x"])[0].argmax() == 2
+    _write_model(tmp_path, "v2", [0, 0, 0, 1])
+    registry.discover()
+
+    registry.activate("v2", warm=lambda version: None)
+    assert _wait_for_activation(registry)["state"] == "active"
+    new = registry.get()
+    assert new is not old and new.checksum != old.checksum
+    assert new.predict_proba(["x"])[0].argmax() == 0
+
+    # The active handle is checked too, not only pinned lookups
+    _write_model(tmp_path, "v2", [1, 1, 1, 0])
+    registry.discover()
+    assert registry.get().predict_proba(["x"])[0].argmax() == 1
+
+def test_worker_following_a_swap_drops_its_startup_model(registry, monkeypatch):
+    from app import model_registry
+    monkeypatch.setattr(model_registry, "MODEL_REGISTRY_MAX_LOADED", 0)
+    assert registry.get().version == "v1"
+
+    registry.follow("v2")
+    assert registry.active_version == "v2"
+    assert registry.get().version == "v2"
+    assert list(registry._loaded) == ["v2"]
+
+def _set_worker_barrier(barrier):
+    inference_executor._worker_barrier = barrier
+
+def _fail_once(path):
+    if not os.path.exists(path):
+        with open(path, 'w'):
+            pass
+        raise RuntimeError("model failed to load")
+
+@pytest.fixture
+def worker_pool(monkeypatch):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(2)
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=context,
+                               initializer=_set_worker_barrier, initargs=(barrier,))
+    monkeypatch.setattr(inference_executor, "INFERENCE_WORKERS", 2)
+    monkeypatch.setattr(inference_executor, "WARM_TIMEOUT", 30.0)
+    monkeypatch.setattr(inference_executor, "_pool", pool)
+    monkeypatch.setattr(inference_executor, "_warm_barrier", barrier)
+    yield pool
+    pool.shutdown(wait=True)
+
+def test_every_worker_runs_the_warm_up_exactly_once(worker_pool):
+    pids = inference_executor._on_every_worker(os.getpid)
+    assert len(pids) == 2 and len(set(pids)) == 2
+
+def test_a_failed_worker_fails_the_warm_up_and_the_next_one_starts_clean(worker_pool, tmp_path):
+    marker = str(tmp_path / "failed")
+    with pytest.raises(Exception):
+        inference_executor._on_every_worker(_fail_once, marker)
+    assert not inference_executor._warm_barrier.broken
+
+    pids = inference_executor._on_every_worker(_fail_once, marker)
+    assert len(set(pids)) == 2
+
+def _slow_once(path):
+    # The first worker to pick this up is slow to load; the other one isn't
+    import time
+    try:
+        with open(path, 'x'):
+            pass
+    except FileExistsError:
+        return os.getpid()
+    time.sleep(3)
+    return os.getpid()
+
+def test_activation_warm_up_does_not_hold_the_pool(worker_pool, monkeypatch, tmp_path):
+    import threading
+
+    monkeypatch.setattr(inference_executor, "_warm_version", _slow_once)
+    inference_executor._on_every_worker(os.getpid)  # both workers started
+    warming = threading.Thread(target=inference_executor.warm_pool_version, args=(str(tmp_path / "slow"),))
+    warming.start()
+    time.sleep(0.5)
+    try:
+        # A live request is served by the worker that finished its preload
+        started = time.monotonic()
+        worker_pool.submit(os.getpid).result(timeout=10)
+        assert time.monotonic() - started < 2
+        assert warming.is_alive()
+    finally:
+        warming.join()
@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from app import ml_utils
+
+TEXTS = [
+    "I can't stop SHAKING before my presentations!!",
+    "Read this: https://example.com/page?x=1 and www.test.org <b>now</b>",
+    "worries, fears & panic attacks... 3 times a day",
+    "it's the people's eyes-watching me_all the time",
+    "Naïve café owners' nerves — déjà vu",
+    "a an I x yz",
+    "",
+    "   \t\n  ",
+]
+
+class SuffixLemmatizer:
+    def lemmatize(self, token):
+        return token[:-1] if token.endswith("s") and len(token) > 3 else token
+
+@pytest.fixture
+def nlp(offline_nlp, monkeypatch):
+    monkeypatch.setattr(ml_utils, "lemmatizer", SuffixLemmatizer())
+    monkeypatch.setattr(ml_utils, "_lemma_table", {})
+    ml_utils._cached_lemma.cache_clear()
+    return ml_utils
+
+def _two_pass_model_input(text, nlp):
+    # clean_text as it was before the shared preprocessing stage
+    text = text.lower()
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'<.*?>', '', text)
+    text = re.sub(r'[^a-zA-Z\s]', ' ', text)
+    tokens = [nlp.lemmatizer.lemmatize(t) for t in text.split() if t not in nlp.stop_words and len(t) > 1]
+    return re.sub(r'\s+', ' ', ' '.join(tokens)).strip()
+
+def _two_pass_word_tokens(text, nlp):
+    # predict_with_words' own tokenization before the shared stage
+    text_clean = re.sub(r'[^\w\s\']', ' ', str(text).lower())
+    return [nlp.lemmatizer.lemmatize(t) for t in text_clean.split() if len(t) > 2]
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_single_pass_matches_the_separate_passes(nlp, text):
+    pre = nlp.preprocess_text(text)
+    assert pre.model_input == _two_pass_model_input(text, nlp)
+    assert pre.model_input == nlp.clean_text(text)
+    assert pre.word_tokens == _two_pass_word_tokens(text, nlp)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import VotingClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from app import model_registry, profiling, write_behind
+from app.model_registry import ModelHandle
+
+TEXTS = ["nervous before the talk", "calm quiet evening", "panic and shaking", "relaxed walk outside"] * 3
+LABELS = [1, 0, 2, 0] * 3
+
+def _pipeline(weights):
+    voting = VotingClassifier([("lr", LogisticRegression(max_iter=200)), ("nb", MultinomialNB())],
+                              voting="soft", weights=weights)
+    return Pipeline([("tfidf", TfidfVectorizer()), ("clf", voting)]).fit(TEXTS, LABELS)
+
+def test_model_stages_accepts_array_weights():
+    _, members, weights = profiling._model_stages(_pipeline(np.array([3.0, 1.0])))
+    assert [name for name, _ in members] == ["lr", "nb"]
+    assert list(weights) == [3.0, 1.0]
+
+class FakeRegistry:
+    def __init__(self, handle):
+        self.handle = handle
+
+    def get(self, version=None):
+        return self.handle
+
+@pytest.fixture
+def profiled(offline_nlp, tmp_path, monkeypatch):
+    model = _pipeline([2, 1])
+    handle = ModelHandle("v1", "0" * 64, "pkl", model)
+    dumps = profiling.SlowestProfiles(str(tmp_path), top_n=10, interval=3600)
+    monkeypatch.setattr(model_registry, "get_registry", lambda: FakeRegistry(handle))
+    monkeypatch.setattr(write_behind, "persist_predictions", lambda rows: None)
+    monkeypatch.setattr(profiling, "get_profile_dumps", lambda: dumps)
+    return model
+
+def test_profiled_predict_writes_a_dump(profiled):
+    result, timings = profiling.profile_predict("panic and shaking before the talk")
+    assert result["model_version"] == "v1"
+    assert set(timings["ensemble_us"]) == {"lr", "nb"}
+    assert timings["profile_dump"] is not None
+
+def test_busy_profiler_skips_the_dump(profiled):
+    assert profiling._profiler_lock.acquire(blocking=False)
+    try:
+        result, timings = profiling.profile_predict("panic and shaking")
+    finally:
+        profiling._profiler_lock.release()
+    assert result is not None
+    assert timings["profile_dump"] is None
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app import main
+
+async def fake_score(texts, model_version=None):
+    return [{"prediction": "Low Anxiety", "text_length": len(text)} for text in texts]
+
+@pytest.fixture
+def stream(monkeypatch):
+    monkeypatch.setattr(main, "score_texts_async", fake_score)
+    monkeypatch.setattr(main, "STREAM_MAX_LINE_BYTES", 24)
+
+    def post(chunks, chunk_size=256):
+        monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", chunk_size)
+
+        async def body():
+            for chunk in chunks:
+                yield chunk
+
+        async def run():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/predict/stream", content=body())
+        return asyncio.run(run())
+    return post
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_lines_split_across_chunks_are_reassembled(stream):
+    response = stream([b"first li", b"ne\n{\"text\": ", b"\"second\"}\nthi", b"rd"])
+    assert response.status_code == 200
+    assert [(r["line"], r["text_length"]) for r in _lines(response)] == [(1, 10), (2, 6), (3, 5)]
+
+def test_line_over_the_limit_before_any_result_is_413(stream):
+    response = stream([b"short\n", b"x" * 15, b"y" * 15, b"\nnever scored\n"])
+    assert response.status_code == 413
+
+def test_line_over_the_limit_after_results_started_ends_the_stream(stream):
+    response = stream([b"short\n", b"x" * 25 + b"\n", b"never scored\n"], chunk_size=1)
+    assert response.status_code == 200
+    lines = _lines(response)
+    assert lines[0]["line"] == 1
+    assert "STREAM_MAX_LINE_BYTES" in lines[-1]["error"]
+    assert len(lines) == 2
@@ -0,0 +1,66 @@
+import numpy as np
+
+from app import metrics, scoring
+from app.prediction_cache import ProbabilityCache
+from app.startup import WARMUP_TEXTS, in_warmup, warmup_scope
+
+class FixedModel:
+    key = "test@0"
+    version = "test"
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, texts):
+        self.calls += 1
+        return np.tile([0.2, 0.3, 0.5], (len(texts), 1))
+
+def _counted():
+    return sum(metrics.PREDICTIONS._values.values())
+
+def test_warm_up_skips_metrics_and_prediction_cache(offline_nlp, monkeypatch):
+    cache = ProbabilityCache(max_entries=16)
+    monkeypatch.setattr(scoring, "get_prediction_cache", lambda: cache)
+    monkeypatch.setattr(scoring, "get_batcher", lambda: None)
+    model = FixedModel()
+    before = _counted()
+
+    with warmup_scope():
+        assert in_warmup()
+        scoring.score_texts(WARMUP_TEXTS, model)
+        scoring.score_texts(WARMUP_TEXTS, model)
+    assert not in_warmup()
+
+    assert _counted() == before
+    assert len(cache._entries) == 0 and cache.hits == cache.misses == 0
+    assert model.calls == 2
+
+    # Real traffic is counted and cached as usual
+    scoring.score_texts(WARMUP_TEXTS, model)
+    assert _counted() == before + len(WARMUP_TEXTS)
+    assert len(cache._entries) == len([t for t in WARMUP_TEXTS if t])
+
+def _stage_counts(*stages):
+    return {stage: metrics.STAGE_SECONDS._values.get((("stage", stage),), [None, 0.0, 0])[2] for stage in stages}
+
+def test_warm_up_with_micro_batching_records_no_stage_timings(offline_nlp, monkeypatch):
+    from app.batcher import MicroBatcher
+    from app.model_registry import ModelHandle
+
+    batcher = MicroBatcher(window_ms=1, max_batch_size=64)
+    monkeypatch.setattr(scoring, "get_batcher", lambda: batcher)
+    monkeypatch.setattr(scoring, "get_prediction_cache", lambda: None)
+    handle = ModelHandle("test", "0" * 64, "pkl", FixedModel())
+    try:
+        before = _stage_counts("ensemble", "clean", "word_scoring")
+        with warmup_scope():
+            scoring.score_texts(WARMUP_TEXTS, handle)
+        assert _stage_counts("ensemble", "clean", "word_scoring") == before
+        assert batcher.stats()["batches"] == 0
+
+        # Live traffic still goes through the batcher and is timed
+        scoring.score_texts(WARMUP_TEXTS, handle)
+        assert batcher.stats()["batches"] == 1
+        assert _stage_counts("ensemble")["ensemble"] == before["ensemble"] + 1
+    finally:
+        batcher.close()
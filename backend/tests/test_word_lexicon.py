@@ -0,0 +1,78 @@
+import csv
+import os
+
+import pytest
+
+from app import word_lexicon
+from app.word_lexicon import LEXICON_FILES, LABEL_PRIORITY, build_lexicon_index
+
+def _rows(files):
+    rows = []
+    for label, path in files.items():
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                rows.extend((r['word'].strip().lower(), label, int(r['weight'])) for r in csv.DictReader(f))
+    return rows
+
+def _linear_lookup(rows, word):
+    """Scan every CSV row for the word, as the scorer did before the compiled index."""
+    best = None
+    for entry_word, label, weight in rows:
+        if entry_word != word:
+            continue
+        if best is None or weight > best[1] or (weight == best[1] and LABEL_PRIORITY[label] > LABEL_PRIORITY[best[0]]):
+            best = (label, weight)
+    if best is None or best[1] < 2:
+        return None
+    label, weight = best
+    return label, weight, weight * 2 if weight >= 3 else weight
+
+def _indexed_lookup(index, word):
+    entry = index.scoring.get(word)
+    return None if entry is None else tuple(entry)
+
+@pytest.fixture
+def conflicting_files(tmp_path):
+    contents = {
+        "High": "word,label,weight\npanic,High,5\nshaky,High,2\ntie,High,3\nweak,High,1\n",
+        "Moderate": "word,label,weight\npanic,Moderate,4\ntie,Moderate,3\nuneasy,Moderate,3\n",
+        "Low": "word,label,weight\n Calm ,Low,2\nshaky,Low,4\ntie,Low,3\nweak,Low,1\n",
+    }
+    files = {}
+    for label, text in contents.items():
+        path = tmp_path / f"{label.lower()}_anxiety_words.csv"
+        path.write_text(text, encoding='utf-8')
+        files[label] = str(path)
+    return files
+
+@pytest.mark.parametrize("which", ["repo", "conflicting"])
+def test_index_matches_a_linear_scan(which, conflicting_files):
+    files = LEXICON_FILES if which == "repo" else conflicting_files
+    rows = _rows(files)
+    index = build_lexicon_index(files)
+    words = {word for word, _, _ in rows} | {"", "unlisted", "panics"}
+    for word in words:
+        assert _indexed_lookup(index, word) == _linear_lookup(rows, word), word
+
+def test_conflicts_resolve_by_weight_then_label(conflicting_files):
+    index = build_lexicon_index(conflicting_files)
+    assert index.words["panic"] == ("High", 5)
+    assert index.words["shaky"] == ("Low", 4)
+    assert index.words["tie"] == ("High", 3)
+    assert "weak" in index.words and "weak" not in index.scoring
+
+def test_edited_csv_is_picked_up_by_the_next_check(conflicting_files, monkeypatch):
+    monkeypatch.setattr(word_lexicon, "LEXICON_FILES", conflicting_files)
+    monkeypatch.setattr(word_lexicon, "LEXICON_CHECK_INTERVAL", 0.001)
+    monkeypatch.setattr(word_lexicon, "_index", None)
+    before = word_lexicon.get_lexicon_index()
+    assert "dread" not in before.scoring
+
+    with open(conflicting_files["High"], 'a', encoding='utf-8') as f:
+        f.write("dread,High,4\n")
+    monkeypatch.setattr(word_lexicon, "_checked_at", 0.0)
+    after = word_lexicon.get_lexicon_index()
+    assert after is not before and after.version != before.version
+    assert tuple(after.scoring["dread"]) == ("High", 4, 8)
+    # The old index is untouched, so in-flight requests keep a consistent view
+    assert "dread" not in before.scoring
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from app import write_behind
+from app.write_behind import WriteBehindQueue
+
+def test_flush_waits_only_for_rows_queued_before_it():
+    written = []
+
+    def slow_writer(rows):
+        time.sleep(0.02)
+        written.extend(rows)
+
+    queue = WriteBehindQueue(max_rows=100000, batch_size=5, flush_ms=1000, writer=slow_writer)
+    stop = threading.Event()
+
+    def producer():
+        i = 0
+        while not stop.is_set():
+            queue.enqueue([("late", i)])
+            i += 1
+            time.sleep(0.001)
+
+    try:
+        queue.enqueue([("early", i) for i in range(20)])
+        thread = threading.Thread(target=producer)
+        thread.start()
+        time.sleep(0.01)
+
+        flusher = threading.Thread(target=queue.flush)
+        flusher.start()
+        flusher.join(timeout=2.0)
+
+        # The producer never stops, yet flush() returned...
+        assert not flusher.is_alive()
+        # ...with every row queued before it committed
+        assert [r for r in written if r[0] == "early"] == [("early", i) for i in range(20)]
+    finally:
+        stop.set()
+        thread.join()
+        queue.close()
+
+def test_flush_with_nothing_queued_returns_immediately():
+    queue = WriteBehindQueue(writer=lambda rows: None)
+    try:
+        started = time.monotonic()
+        queue.flush()
+        assert time.monotonic() - started < 0.1
+    finally:
+        queue.close()
+
+def test_close_writes_everything_still_queued():
+    written = []
+    queue = WriteBehindQueue(batch_size=1000, flush_ms=60000, writer=written.extend)
+    queue.enqueue([(i,) for i in range(50)])
+    queue.close()
+    assert written == [(i,) for i in range(50)]
+
+def test_failed_batch_is_retried(monkeypatch):
+    monkeypatch.setattr(write_behind, "WRITE_BEHIND_RETRY_BACKOFF", 0.001)
+    written, failures = [], [2]
+
+    def flaky_writer(rows):
+        if failures[0]:
+            failures[0] -= 1
+            raise RuntimeError("database is locked")
+        written.extend(rows)
+
+    queue = WriteBehindQueue(flush_ms=1, writer=flaky_writer, retries=3)
+    try:
+        queue.enqueue([(i,) for i in range(5)])
+        queue.flush()
+        assert written == [(i,) for i in range(5)]
+        stats = queue.stats()
+        assert stats["write_retries"] == 2 and stats["rows_dropped"] == 0 and stats["rows_written"] == 5
+    finally:
+        queue.close()
+
+def test_rows_are_counted_as_dropped_once_retries_run_out(monkeypatch):
+    monkeypatch.setattr(write_behind, "WRITE_BEHIND_RETRY_BACKOFF", 0.001)
+
+    def broken_writer(rows):
+        raise RuntimeError("disk I/O error")
+
+    queue = WriteBehindQueue(flush_ms=1, writer=broken_writer, retries=1)
+    try:
+        queue.enqueue([(i,) for i in range(3)])
+        queue.flush()  # returns: dropped rows still count as settled
+        stats = queue.stats()
+        assert stats["rows_dropped"] == 3 and stats["rows_written"] == 0 and stats["write_retries"] == 1
+    finally:
+        queue.close()
+
+def test_save_errors_reach_the_caller(temp_db, monkeypatch):
+    temp_db.close_pool()
+    monkeypatch.setattr(temp_db, "DB_PATH", "/nonexistent/dir/predictions.db")
+    with pytest.raises(Exception):
+        temp_db.save_predictions([("t", "Low Anxiety", 0.5, "[]", "2026-10-01T00:00:00+00:00", "v1")])
+    # The request path logs the failure and still returns its predictions
+    monkeypatch.setattr(write_behind, "WRITE_BEHIND", False)
+    write_behind.persist_predictions([("t", "Low Anxiety", 0.5, "[]", "2026-10-01T00:00:00+00:00", "v1")])
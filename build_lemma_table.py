@@ -0,0 +1,116 @@
+"""
+Precompute the WordNet lemma table used by the backend at runtime.
+
+Covers every token the model and the word CSVs can see:
+  - unigrams from the word TF-IDF vocabulary of the production model,
+  - the words in the *_anxiety_words.csv lexicons,
+  - the noun inflections WordNetLemmatizer reverses (-s, -es, -ies, -men),
+  - the most frequent raw tokens of the training corpus (Combined Data.csv).
+
+Usage: python build_lemma_table.py [--corpus "Combined Data.csv"] [--top 50000]
+"""
+import argparse
+import csv
+import os
+import pickle
+import re
+import sys
+from collections import Counter
+
+import nltk
+from nltk.stem import WordNetLemmatizer
+
+nltk.download('wordnet', quiet=True)
+
+# Inputs and outputs resolve against the repo root, so the script works from any directory
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(REPO_DIR, 'backend')
+MODEL_PATH = os.path.join(BACKEND_DIR, 'ml_models', 'nlp_anxiety_model_v6.pkl')
+OUTPUT_PATH = os.path.join(BACKEND_DIR, 'ml_models', 'lemma_table.tsv')
+WORD_CSVS = [os.path.join(REPO_DIR, name)
+             for name in ('high_anxiety_words.csv', 'moderate_anxiety_words.csv', 'low_anxiety_words.csv')]
+DEFAULT_CORPUS = os.path.join(REPO_DIR, 'Combined Data.csv')
+
+# Same tokenizers as ml_utils (model input) and the word-scoring pass
+ALPHA_TOKEN = re.compile(r'[a-zA-Z]+')
+WORD_TOKEN = re.compile(r"[\w']+")
+
+def model_vocabulary(model_path):
+    if not os.path.exists(model_path):
+        print(f"Warning: {model_path} not found, skipping model vocabulary.")
+        return set()
+    with open(model_path, 'rb') as f:
+        pipeline = pickle.load(f)
+    vocab = set()
+    for name, vectorizer in pipeline.named_steps['features'].transformer_list:
+        if getattr(vectorizer, 'analyzer', None) == 'word':
+            for ngram in vectorizer.vocabulary_:
+                vocab.update(ngram.split())
+    return vocab
+
+def lexicon_words():
+    words = set()
+    for path in WORD_CSVS:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    words.add(row['word'].strip().lower())
+    return words
+
+def noun_inflections(words):
+    forms = set()
+    for w in words:
+        forms.update({w + 's', w + 'es'})
+        if w.endswith('y'):
+            forms.add(w[:-1] + 'ies')
+        if w.endswith('man'):
+            forms.add(w[:-3] + 'men')
+    return forms
+
+def corpus_vocabulary(corpus_path, top_n):
+    if not os.path.exists(corpus_path):
+        print(f"Warning: {corpus_path} not found, skipping corpus vocabulary.")
+        return set()
+    import pandas as pd
+    df = pd.read_csv(corpus_path)
+    column = 'statement' if 'statement' in df.columns else 'sentence'
+    counts = Counter()
+    for text in df[column].dropna().astype(str):
+        text = text.lower()
+        counts.update(ALPHA_TOKEN.findall(text))
+        counts.update(WORD_TOKEN.findall(text))
+    return {token for token, _ in counts.most_common(top_n)}
+
+def build(corpus_path, top_n):
+    base = model_vocabulary(MODEL_PATH) | lexicon_words()
+    tokens = base | noun_inflections(base) | corpus_vocabulary(corpus_path, top_n)
+    tokens = sorted(t for t in tokens if t and '\t' not in t and '\n' not in t)
+
+    lemmatizer = WordNetLemmatizer()
+    changed = 0
+    with open(OUTPUT_PATH, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(f"# lemma-table v1: {len(tokens)} tokens, WordNetLemmatizer noun lemmas\n")
+        for token in tokens:
+            lemma = lemmatizer.lemmatize(token)
+            if lemma == token:
+                f.write(f"{token}\n")
+            else:
+                f.write(f"{token}\t{lemma}\n")
+                changed += 1
+    print(f"Wrote {len(tokens)} tokens ({changed} with a different lemma) to {OUTPUT_PATH}")
+
+    # Parity check: the runtime loader must reproduce WordNet exactly on the covered vocabulary
+    sys.path.insert(0, BACKEND_DIR)
+    from app import ml_utils
+    table = ml_utils.load_lemma_table()
+    mismatches = [t for t in tokens if table.get(t) != lemmatizer.lemmatize(t)]
+    if mismatches:
+        raise SystemExit(f"Lemma table mismatch for {len(mismatches)} tokens, e.g. {mismatches[:5]}")
+    print("Parity check passed: table matches WordNetLemmatizer on every covered token.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--top', type=int, default=50000, help="most frequent corpus tokens to include")
+    args = parser.parse_args()
+    build(args.corpus, args.top)
@@ -4,11 +4,17 @@ import re
 import string
 import pickle
 import os
+import sys
+import argparse
+import json
+import hashlib
+import time
+from datetime import datetime, timezone
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
 from sklearn.pipeline import Pipeline, FeatureUnion
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import LinearSVC
@@ -30,22 +36,54 @@ HIGH_RISK_PHRASES = [
     r"don't want to live", r"better off dead", r"don't want to be here anymore"
 ]
 
+# Bump when clean_text's output changes in a way the source hash wouldn't catch (e.g. new NLTK data)
+CLEAN_TEXT_VERSION = 2
+# Cleaned corpora are cached here, keyed by input file hash and a hash of this script's source
+CLEAN_CACHE_DIR = '.clean_cache'
+# Rows per task sent to a cleaning worker
+CLEAN_CHUNK_SIZE = 2000
+
+URL_RE = re.compile(r'https?://\S+|www\.\S+')
+HTML_TAG_RE = re.compile(r'<.*?>')
+PUNCTUATION_RE = re.compile(f'[{re.escape(string.punctuation)}]')
+NON_ALPHA_RE = re.compile(r'[^a-zA-Z\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Built once per process (main or cleaning worker) instead of once per row
+_stop_words = None
+_lemmatizer = None
+_lemma_cache = {}
+
+def _nlp_resources():
+    global _stop_words, _lemmatizer
+    if _stop_words is None:
+        _stop_words = frozenset(stopwords.words('english'))
+        _lemmatizer = WordNetLemmatizer()
+    return _stop_words, _lemmatizer
+
+def _lemmatize(token):
+    lemma = _lemma_cache.get(token)
+    if lemma is None:
+        lemma = _lemma_cache[token] = _lemmatizer.lemmatize(token)
+    return lemma
+
 def clean_text(text):
     if not isinstance(text, str):
         return ""
+    stop_words, _ = _nlp_resources()
     
     # Lowercase
     text = text.lower()
     
     # Remove URLs
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = URL_RE.sub('', text)
     
     # Remove HTML tags (noise)
-    text = re.sub(r'<.*?>', '', text)
+    text = HTML_TAG_RE.sub('', text)
     
     # Remove punctuation & special characters
-    text = re.sub(f'[{re.escape(string.punctuation)}]', ' ', text)
-    text = re.sub(r'[^a-zA-Z\s]', ' ', text)
+    text = PUNCTUATION_RE.sub(' ', text)
+    text = NON_ALPHA_RE.sub(' ', text)
     
     # Tokenization for stopwords removal and lemmatization
     tokens = text.split()
@@ -54,20 +92,69 @@ def clean_text(text):
     tokens = [t for t in tokens if len(t) > 1]
     
     # Remove stopwords
-    stop_words = set(stopwords.words('english'))
     tokens = [t for t in tokens if t not in stop_words]
     
     # Lemmatization
-    lemmatizer = WordNetLemmatizer()
-    tokens = [lemmatizer.lemmatize(t) for t in tokens]
+    tokens = [_lemmatize(t) for t in tokens]
     
     # Rejoin
     text = ' '.join(tokens)
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WHITESPACE_RE.sub(' ', text).strip()
     return text
 
+def _clean_chunk(texts):
+    return [clean_text(t) for t in texts]
+
+def clean_corpus(texts, workers=None):
+    """
+    clean_text over a list of texts, in CLEAN_CHUNK_SIZE chunks spread over
+    `workers` processes (all cores by default). Output order matches the input.
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= CLEAN_CHUNK_SIZE:
+        return _clean_chunk(texts)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = [texts[i:i + CLEAN_CHUNK_SIZE] for i in range(0, len(texts), CLEAN_CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_nlp_resources) as pool:
+        return [cleaned for chunk in pool.map(_clean_chunk, chunks) for cleaned in chunk]
+
+def _clean_cache_path(csv_path):
+    """
+    Cache file for csv_path; changes with the file's content and with the code.
+    The whole script is hashed rather than clean_text alone, so edits to its
+    helpers, patterns or resources can't reuse a stale cache.
+    """
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    with open(os.path.abspath(__file__), 'rb') as f:
+        source = f.read()
+    code = hashlib.sha256(f"{CLEAN_TEXT_VERSION}:{nltk.__version__}:".encode() + source).hexdigest()
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(csv_path)), CLEAN_CACHE_DIR)
+    return os.path.join(cache_dir, f"{digest.hexdigest()[:16]}-{code[:12]}.npz")
+
+def save_cleaned(path, cleaned):
+    """Store strings as one UTF-8 buffer plus offsets, so loading needs no pickle."""
+    encoded = [c.encode('utf-8') for c in cleaned]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, data=np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets=offsets)
+    os.replace(tmp_path, path)
+
+def load_cleaned(path):
+    with np.load(path) as cache:
+        data = cache['data'].tobytes()
+        offsets = cache['offsets']
+    return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
 def check_risk_phrases(text):
     """Checks if the text contains any high-risk phrases."""
     text_lower = text.lower()
@@ -84,7 +171,11 @@ def check_risk_phrases(text):
             detected.append(phrase)
     return detected
 
-def load_and_preprocess_data(csv_path):
+def load_and_preprocess_data(csv_path, workers=None, use_cache=True):
+    """
+    Load and label the CSV, then clean every sentence. The cleaned column is
+    cached on disk, so a re-run on an unchanged file skips cleaning entirely.
+    """
     print(f"Loading data from {csv_path}...")
     try:
         df = pd.read_csv(csv_path)
@@ -111,8 +202,19 @@ def load_and_preprocess_data(csv_path):
         print("CSV format incorrect.")
         return None
 
-    print("Cleaning text...")
-    df['sentence'] = df['sentence'].apply(clean_text)
+    cache_path = _clean_cache_path(csv_path) if use_cache else None
+    if cache_path and os.path.exists(cache_path):
+        print(f"Loading cleaned text from cache {cache_path}...")
+        cleaned = load_cleaned(cache_path)
+    else:
+        print(f"Cleaning text ({workers or os.cpu_count()} worker(s))...")
+        started = time.perf_counter()
+        cleaned = clean_corpus(df['sentence'], workers=workers)
+        print(f"Cleaned {len(cleaned)} rows in {time.perf_counter() - started:.1f}s")
+        if cache_path:
+            save_cleaned(cache_path, cleaned)
+            print(f"Cleaned text cached: {cache_path}")
+    df['sentence'] = cleaned
     df = df.dropna(subset=['sentence', 'label'])
     df = df[df['sentence'].str.strip() != '']
     df = df.drop_duplicates(subset=['sentence'])
@@ -120,7 +222,11 @@ def load_and_preprocess_data(csv_path):
     print(f"Original dataset size: {len(df)}")
     return df
 
-def train_and_evaluate(df):
+# Hashed feature spaces for the "hashing" config: no vocabulary is stored, only an idf vector
+HASH_WORD_FEATURES = 2 ** 17
+HASH_CHAR_FEATURES = 2 ** 15
+
+def split_and_balance(df):
     X = df['sentence']
     y = df['label']
     
@@ -142,12 +248,26 @@ def train_and_evaluate(df):
     df_train_bal = pd.concat([df_0_bal, df_1_bal, df_2_bal])
     df_train_bal = shuffle(df_train_bal, random_state=42)
     
-    X_train = df_train_bal['sentence']
-    y_train = df_train_bal['label']
-    
-    # V6 Feature Engineering for >92% accuracy
-    from sklearn.pipeline import FeatureUnion
-    
+    return df_train_bal['sentence'], df_train_bal['label'], X_test, y_test
+
+def build_features(kind='tfidf'):
+    """
+    'tfidf': V6 word 1-3 + char 2-5 TfidfVectorizers (vocabularies stored in the model).
+    'hashing': same n-grams hashed into fixed-size spaces, with a fitted idf vector.
+    """
+    if kind == 'hashing':
+        word = Pipeline([
+            ('hash', HashingVectorizer(analyzer='word', ngram_range=(1, 3), stop_words='english',
+                                       n_features=HASH_WORD_FEATURES, alternate_sign=False, norm=None)),
+            ('idf', TfidfTransformer(sublinear_tf=True))
+        ])
+        char = Pipeline([
+            ('hash', HashingVectorizer(analyzer='char', ngram_range=(2, 5),
+                                       n_features=HASH_CHAR_FEATURES, alternate_sign=False, norm=None)),
+            ('idf', TfidfTransformer(sublinear_tf=True))
+        ])
+        return FeatureUnion([('word', word), ('char', char)])
+
     word_tfidf = TfidfVectorizer(
         analyzer='word',
         ngram_range=(1, 3), 
@@ -165,16 +285,14 @@ def train_and_evaluate(df):
         sublinear_tf=True
     )
     
-    features = FeatureUnion([
+    return FeatureUnion([
         ('word', word_tfidf),
         ('char', char_tfidf)
     ])
-    
+
+def fit_ensemble(X_train, y_train, features):
     print("Vectorizing with V6 Features (Word 1-3 + Char 2-5)...")
     X_train_tfidf = features.fit_transform(X_train)
-    X_test_tfidf = features.transform(X_test)
-    
-    cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
     
     print("\n--- Training V6 Ensemble Members ---")
     
@@ -202,24 +320,147 @@ def train_and_evaluate(df):
     print("Fitting V7 Ensemble...")
     ensemble.fit(X_train_tfidf, y_train)
     
-    y_pred = ensemble.predict(X_test_tfidf)
-    print("\nEvaluation:")
-    print(classification_report(y_test, y_pred, target_names=['Low', 'Moderate', 'High']))
-    
-    pipeline = Pipeline([
+    return Pipeline([
         ('features', features),
         ('clf', ensemble)
     ])
+
+def train_and_evaluate(df, features='tfidf'):
+    X_train, y_train, X_test, y_test = split_and_balance(df)
+    pipeline = fit_ensemble(X_train, y_train, build_features(features))
     
-    return pipeline
+    y_pred = pipeline.predict(X_test)
+    print("\nEvaluation:")
+    print(classification_report(y_test, y_pred, target_names=['Low', 'Moderate', 'High']))
+    
+    report = classification_report(y_test, y_pred, target_names=['Low', 'Moderate', 'High'], output_dict=True)
+    metrics = {
+        'features': features,
+        'accuracy': report['accuracy'],
+        'macro_f1': report['macro avg']['f1-score'],
+        'f1_per_class': {label: report[label]['f1-score'] for label in ['Low', 'Moderate', 'High']},
+        'test_samples': len(y_test),
+    }
+    return pipeline, metrics
 
-def save_model(model, filename='nlp_anxiety_model.pkl'):
+def compare_feature_configs(df, report_path='feature_config_comparison.json'):
+    """
+    Train the tfidf (V6) and hashing configs on the same split and report artifact
+    size, load time, transform latency and accuracy side by side.
+    """
+    import tempfile
+
+    X_train, y_train, X_test, y_test = split_and_balance(df)
+    sample = X_test.tolist()[:1000]
+    results = {}
+    for kind in ('tfidf', 'hashing'):
+        print(f"\n=== Feature config: {kind} ===")
+        pipeline = fit_ensemble(X_train, y_train, build_features(kind))
+        strip_unused_attributes(pipeline)
+        y_pred = pipeline.predict(X_test)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.pkl')
+            with open(path, 'wb') as f:
+                pickle.dump(pipeline, f)
+            size = os.path.getsize(path)
+            load_times = []
+            for _ in range(3):
+                started = time.perf_counter()
+                with open(path, 'rb') as f:
+                    pickle.load(f)
+                load_times.append(time.perf_counter() - started)
+
+        features = pipeline.named_steps['features']
+        started = time.perf_counter()
+        for text in sample:
+            features.transform([text])
+        single = (time.perf_counter() - started) / max(1, len(sample))
+        started = time.perf_counter()
+        features.transform(sample)
+        batch = time.perf_counter() - started
+
+        results[kind] = {
+            'n_features': int(features.transform(sample[:1]).shape[1]),
+            'artifact_mb': size / 1e6,
+            'load_ms': min(load_times) * 1000,
+            'transform_single_ms': single * 1000,
+            'transform_batch_1000_ms': batch * 1000,
+            'accuracy': accuracy_score(y_test, y_pred),
+            'macro_f1': classification_report(y_test, y_pred, output_dict=True)['macro avg']['f1-score'],
+        }
+
+    print(f"\n{'':26}{'tfidf':>12}{'hashing':>12}")
+    for key in results['tfidf']:
+        print(f"{key:26}{results['tfidf'][key]:>12.4g}{results['hashing'][key]:>12.4g}")
+    with open(report_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nComparison saved: {report_path}")
+    return results
+
+def strip_unused_attributes(model):
+    """
+    Drop TfidfVectorizer.stop_words_ (every term pruned by min_df/max_features).
+    It is only kept for introspection and is often larger than the vocabulary itself.
+    """
+    features = model.steps[0][1]
+    parts = [t for _, t in features.transformer_list] if isinstance(features, FeatureUnion) else [features]
+    for vectorizer in parts:
+        if hasattr(vectorizer, 'stop_words_'):
+            del vectorizer.stop_words_
+
+def save_model(model, filename='nlp_anxiety_model.pkl', metrics=None):
+    strip_unused_attributes(model)
     os.makedirs('backend/ml_models', exist_ok=True)
     filepath = os.path.join('backend/ml_models', filename)
     with open(filepath, 'wb') as f:
         pickle.dump(model, f)
     print(f"\nModel saved: {filepath}")
 
+    # Sidecar read by the backend model registry (GET /admin/models)
+    with open(filepath, 'rb') as f:
+        checksum = hashlib.sha256(f.read()).hexdigest()
+    meta_path = os.path.splitext(filepath)[0] + '.meta.json'
+    with open(meta_path, 'w') as f:
+        json.dump({
+            'trained_at': datetime.now(timezone.utc).isoformat(),
+            'sha256': checksum,
+            'metrics': metrics,
+        }, f, indent=2)
+    print(f"Metadata saved: {meta_path}")
+
+def export_flat_model(model_path, sample_texts=None):
+    """
+    Write the memory-mappable .flat artifact next to a saved pickle, then report
+    load times and the parity of the exact and fused scorers against the pickle
+    (saved as parity_report.json inside the artifact).
+    """
+    sys.path.append('backend')
+    from app.flat_model import export_flat_model as export_flat, parity_report, time_loads
+
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    flat_path = os.path.splitext(model_path)[0] + '.flat'
+    export_flat(model, flat_path, source_path=model_path)
+
+    size = sum(os.path.getsize(os.path.join(flat_path, name)) for name in os.listdir(flat_path))
+    print(f"\nFlat model saved: {flat_path} ({size / 1e6:.1f} MB)")
+    timings = time_loads(model_path, flat_path)
+    print(f"Load time: pickle {timings['pickle_seconds'] * 1000:.1f} ms, flat {timings['flat_seconds'] * 1000:.1f} ms")
+    if sample_texts:
+        report = parity_report(model, flat_path, list(sample_texts))
+        print(f"Parity on {report['samples']} held-out samples:")
+        for mode in ("exact", "fused"):
+            r = report[mode]
+            print(f"  {mode}: max |p_pickle - p_flat| = {r['max_abs_deviation']:.2e}, "
+                  f"label agreement {r['label_agreement'] * 100:.2f}%, ensemble {r['classify_seconds'] * 1000:.1f} ms")
+    return flat_path
+
+def held_out_texts(df):
+    """The test split used by train_and_evaluate (same seed and stratification)."""
+    _, X_test, _, _ = train_test_split(df['sentence'], df['label'], test_size=0.2, random_state=42, stratify=df['label'])
+    return X_test.tolist()
+
 def calculate_severity_score(confidence, label_idx, detected_risks):
     """
     Computes a 0-100 severity score based on ML output and detected signals.
@@ -294,10 +535,31 @@ def predict_v3(sentence, model):
     }
 
 if __name__ == "__main__":
-    df = load_and_preprocess_data('Combined Data.csv')
-    if df is not None:
-        model = train_and_evaluate(df)
-        save_model(model, 'nlp_anxiety_model_v8.pkl')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--export-flat', metavar='MODEL_PKL', help="Only export an existing pickle to the flat format")
+    parser.add_argument('--features', choices=['tfidf', 'hashing'], default='tfidf',
+                        help="tfidf: stored vocabularies (V6); hashing: hashed n-grams + fitted idf")
+    parser.add_argument('--compare-features', action='store_true',
+                        help="Train both feature configs and report size, load time, latency and accuracy")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes used to clean the corpus (default: all cores)")
+    parser.add_argument('--no-clean-cache', action='store_true',
+                        help=f"Always re-clean the corpus instead of reusing {CLEAN_CACHE_DIR}/")
+    args = parser.parse_args()
+    load_options = {'workers': args.workers, 'use_cache': not args.no_clean_cache}
+
+    if args.export_flat:
+        df = load_and_preprocess_data('Combined Data.csv', **load_options) if os.path.exists('Combined Data.csv') else None
+        export_flat_model(args.export_flat, held_out_texts(df) if df is not None else None)
+        sys.exit(0)
+
+    df = load_and_preprocess_data('Combined Data.csv', **load_options)
+    if df is not None and args.compare_features:
+        compare_feature_configs(df)
+    elif df is not None:
+        model, metrics = train_and_evaluate(df, features=args.features)
+        save_model(model, 'nlp_anxiety_model_v8.pkl', metrics)
+        export_flat_model('backend/ml_models/nlp_anxiety_model_v8.pkl', held_out_texts(df))
         
         # Quick test
         print("\n--- V3 Production Test ---")